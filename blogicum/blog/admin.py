@@ -1,17 +1,99 @@
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.template.response import TemplateResponse
 
+from . import lookups, timeline
+from .cache import invalidate_posts
 from .models import Category, Comment, Location, Post, Profile
+from .purge import purge_posts
+from .utils import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список без полного COUNT(*) по таблице.
+
+    Фильтры по категории и местоположению оставлены: эти таблицы
+    маленькие, и варианты фильтра загружаются одним коротким запросом.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class PublishActionsMixin:
+    """Публикация и снятие с публикации одним UPDATE на всю выборку.
+
+    Сигналы при update() не отправляются, поэтому кэши сбрасываются
+    здесь, один раз на пачку, и в журнал пишется одна запись.
+    """
+
+    actions = ('publish_selected', 'unpublish_selected')
+    log_sample_size = 10
+
+    def get_timeline_categories(self, queryset):
+        return ()
+
+    def set_published(self, request, queryset, value):
+        categories = set()
+        if timeline.TIMELINE_FANOUT:
+            categories = set(self.get_timeline_categories(queryset))
+        updated = queryset.update(is_published=value)
+
+        invalidate_posts()
+        if self.model in (Category, Location):
+            lookups.invalidate(self.model)
+        for category_id in categories:
+            timeline.reset(category_id)
+        LogEntry.objects.log_action(
+            user_id=request.user.pk,
+            content_type_id=ContentType.objects.get_for_model(self.model).pk,
+            object_id=None,
+            object_repr=f'{updated} шт.',
+            action_flag=CHANGE,
+            change_message=self.describe_selection(request, value, updated),
+        )
+        self.message_user(request, f'Изменено записей: {updated}')
+
+    def describe_selection(self, request, value, updated):
+        # Краткая запись: число строк и диапазон id с выборкой из первых,
+        # без лишнего запроса и без полного списка на тысячи строк.
+        if request.POST.get('select_across') == '1':
+            return (f'is_published={value}; записей: {updated}; '
+                    f'все по фильтру ?{request.GET.urlencode()}')
+        ids = sorted(
+            int(pk) for pk in request.POST.getlist(
+                helpers.ACTION_CHECKBOX_NAME))
+        sample = ', '.join(map(str, ids[:self.log_sample_size]))
+        if len(ids) > self.log_sample_size:
+            sample += ', …'
+        return (f'is_published={value}; записей: {updated}; '
+                f'id {ids[0]}–{ids[-1]}: {sample}')
+
+    @admin.action(
+        description='Опубликовать выбранные', permissions=('change',))
+    def publish_selected(self, request, queryset):
+        self.set_published(request, queryset, True)
+
+    @admin.action(
+        description='Снять с публикации выбранные', permissions=('change',))
+    def unpublish_selected(self, request, queryset):
+        self.set_published(request, queryset, False)
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = ('title', 'slug', 'is_published')
     search_fields = ('title', 'slug')
     list_filter = ('is_published',)
 
+    def get_timeline_categories(self, queryset):
+        return queryset.values_list('pk', flat=True)
+
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = ('name', 'created_at', 'is_published')
     search_fields = ('name',)
     list_filter = ('is_published',)
@@ -19,26 +101,65 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(PublishActionsMixin, LargeTableAdmin):
     list_display = (
         'title', 'author', 'pub_date',
         'is_published', 'created_at',
         'category', 'location')
 
-    search_fields = ('title', 'author__username', 'category__title')
+    list_select_related = ('author', 'category', 'location')
+    autocomplete_fields = ('author', 'category', 'location')
+    # Имя автора и слаг сравниваются точно, по уникальным индексам.
+    # Поиск по началу заголовка SQLite выполняет полным просмотром, а поля
+    # поиска объединяются через OR, поэтому просмотр идёт при любом запросе.
+    search_fields = (
+        '^title', 'author__username__exact', 'category__slug__exact')
     list_filter = ('pub_date', 'category', 'location')
     ordering = ('-pub_date',)
+    actions = (*PublishActionsMixin.actions, 'purge_selected')
+
+    def get_timeline_categories(self, queryset):
+        return queryset.order_by().values_list(
+            'category_id', flat=True).distinct()
+
+    @admin.action(
+        description='Удалить выбранные посты порциями',
+        permissions=('delete',),
+    )
+    def purge_selected(self, request, queryset):
+        if request.POST.get('post') == 'yes':
+            deleted = purge_posts(queryset)
+            self.message_user(request, f'Удалено постов: {deleted}')
+            return None
+        # Удаление необратимо, поэтому сначала страница подтверждения,
+        # как у стандартного delete_selected.
+        return TemplateResponse(
+            request, 'admin/blog/post/purge_selected_confirmation.html', {
+                **self.admin_site.each_context(request),
+                'opts': self.model._meta,
+                'post_count': queryset.count(),
+                'comment_count': Comment.objects.filter(
+                    post__in=queryset).count(),
+                'selected': request.POST.getlist(
+                    helpers.ACTION_CHECKBOX_NAME),
+                'select_across': request.POST.get('select_across') == '1',
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            })
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ('post', 'author', 'created_at')
-    search_fields = ('post__title', 'author__username', 'text')
-    list_filter = ('created_at',)
+class CommentAdmin(PublishActionsMixin, LargeTableAdmin):
+    list_display = ('post', 'author', 'created_at', 'is_published')
+    list_select_related = ('post', 'author')
+    autocomplete_fields = ('post', 'author')
+    search_fields = ('^post__title', 'author__username__exact')
+    list_filter = ('created_at', 'is_published')
     ordering = ('-created_at',)
 
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'created_at')
-    search_fields = ('user__username',)
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    search_fields = ('user__username__exact',)
@@ -0,0 +1,38 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from blog import views
+
+
+def offload(view):
+    # В Django 3.2 нет асинхронного ORM. Обычное синхронное представление
+    # ASGI-обработчик и так выполняет в одном общем потоке
+    # (thread_sensitive=True), поэтому запросы идут по очереди. Здесь
+    # представление уходит в пул потоков, и несколько запросов к базе
+    # и рендеринг шаблонов выполняются параллельно.
+    def render_view(request, *args, **kwargs):
+        # Соединения потоков пула не закрываются сигналами запроса,
+        # поэтому их состояние проверяется здесь.
+        close_old_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        return await sync_to_async(render_view, thread_sensitive=False)(
+            request, *args, **kwargs)
+
+    return async_view
+
+
+index = offload(views.index)
+category_posts = offload(views.category_posts)
+profile_view = offload(views.profile_view)
+post_detail = offload(views.PostDetailView.as_view())
@@ -0,0 +1,59 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import (check_password, get_hasher,
+                                         identify_hasher, make_password)
+
+from blog.hashers import HashingPoolBusy, run_hashing
+
+logger = logging.getLogger('blog.performance')
+
+User = get_user_model()
+
+
+def _must_update(encoded):
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher()
+    return (
+        hasher.algorithm != preferred.algorithm
+        or preferred.must_update(encoded)
+    )
+
+
+class BoundedHashingModelBackend(ModelBackend):
+    """Проверяет пароль в ограниченном пуле потоков.
+
+    Поиск пользователя и сохранение нового хеша остаются в потоке запроса,
+    в пул уходит только вычисление хеша. Если пул занят, HashingPoolBusy
+    не перехватывается: клиент получает 503, а не «неверный пароль».
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            # Хешируем впустую, чтобы время ответа не выдавало,
+            # существует ли пользователь.
+            run_hashing(make_password, password)
+            return None
+        if not run_hashing(check_password, password, user.password):
+            return None
+        if not self.user_can_authenticate(user):
+            return None
+        if _must_update(user.password):
+            try:
+                user.password = run_hashing(make_password, password)
+            except HashingPoolBusy:
+                # Пароль уже проверен, пересчитать хеш можно в другой раз.
+                logger.warning('password rehash skipped: pool is saturated')
+            else:
+                user.save(update_fields=['password'])
+        return user
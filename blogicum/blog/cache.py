@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+POST_CACHE_TIMEOUT = getattr(settings, 'POST_CACHE_TIMEOUT', 60)
+EXACT_COUNT_THRESHOLD = getattr(settings, 'EXACT_COUNT_THRESHOLD', 1000)
+ESTIMATED_COUNT_TIMEOUT = getattr(settings, 'ESTIMATED_COUNT_TIMEOUT', 600)
+
+POSTS_VERSION_KEY = 'blog:posts:version'
+
+
+def get_posts_version():
+    return cache.get_or_set(POSTS_VERSION_KEY, time.time_ns, None)
+
+
+def invalidate_posts():
+    try:
+        cache.incr(POSTS_VERSION_KEY)
+    except ValueError:
+        cache.set(POSTS_VERSION_KEY, time.time_ns(), None)
+
+
+def count_rows(queryset, key):
+    # Точный подсчёт ограничен порогом; для больших выборок используется
+    # полный COUNT(*), который пересчитывается не чаще раза в таймаут.
+    count = queryset[:EXACT_COUNT_THRESHOLD + 1].count()
+    if count <= EXACT_COUNT_THRESHOLD:
+        return count
+    key = f'blog:count:{key}'
+    estimate = cache.get(key)
+    if estimate is None:
+        estimate = queryset.count()
+        cache.set(key, estimate, ESTIMATED_COUNT_TIMEOUT)
+    return estimate
+
+
+def get_post_ids(scope, queryset, start, stop):
+    key = f'blog:posts:{get_posts_version()}:{scope}:{start}:{stop}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(queryset.values_list('pk', flat=True)[start:stop])
+        cache.set(key, ids, POST_CACHE_TIMEOUT)
+    return ids
+
+
+def get_post_count(scope, queryset):
+    key = f'blog:posts:{get_posts_version()}:{scope}:count'
+    count = cache.get(key)
+    if count is None:
+        count = count_rows(queryset, scope)
+        cache.set(key, count, POST_CACHE_TIMEOUT)
+    return count
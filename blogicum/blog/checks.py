@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+
+
+@register()
+def check_shared_user_cache(app_configs, **kwargs):
+    # Пользователь из сессии сбрасывается в кэше сигналом только в том
+    # процессе, где его сохранили. С кэшем в памяти процесса остальные
+    # процессы до USER_CACHE_TIMEOUT видят старый пароль и is_active.
+    if (
+        settings.DEBUG
+        or not getattr(settings, 'CACHED_AUTH_USER', False)
+        or 'blog.middleware.CachedAuthenticationMiddleware'
+        not in settings.MIDDLEWARE
+        or not isinstance(caches['default'], LocMemCache)
+    ):
+        return []
+    return [Warning(
+        'CachedAuthenticationMiddleware с LocMemCache: после смены пароля '
+        'или блокировки пользователя другие процессы ещё до '
+        'USER_CACHE_TIMEOUT секунд пускают его старые сессии.',
+        hint='Используйте общий кэш (Redis, Memcached) в CACHES["default"] '
+             'или выключите CACHED_AUTH_USER.',
+        id='blog.W001',
+    )]
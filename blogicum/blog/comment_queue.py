@@ -0,0 +1,238 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.models import Comment
+
+logger = logging.getLogger('blog.performance')
+
+COMMENT_WRITE_BEHIND = getattr(settings, 'COMMENT_WRITE_BEHIND', False)
+
+# Журналы, открытые очередями этого процесса.
+_own_journals = set()
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class CommentQueue:
+    """Очередь комментариев с отложенной пакетной записью в базу.
+
+    Каждый комментарий сначала дописывается в журнал процесса на диске,
+    затем единственный поток-писатель сохраняет их пачками через
+    bulk_create. После каждой пачки журнал переписывается, и в нём
+    остаются только незаписанные комментарии. Журналы упавших процессов
+    подхватываются при старте; дубли при повторной записи отсекает
+    уникальный idempotency_key. Пачку, которую не удалось записать за
+    max_retries попыток, писатель сохраняет по одному, а не принятые
+    базой комментарии откладывает в failed-comments.jsonl.
+    """
+
+    def __init__(self, directory, batch_size=100, flush_interval=1.0,
+                 max_retries=3):
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._journal_path = None
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            orphans = self._claim_orphaned_journals()
+            self._journal_path = self._new_journal_path()
+            self._journal = open(self._journal_path, 'a', encoding='utf-8')
+            for orphan in orphans:
+                for comment in self._read_journal(orphan):
+                    self._append(comment)
+                # Удаляется только после того, как записи попали
+                # в новый журнал.
+                orphan.unlink()
+            self._thread = threading.Thread(
+                target=self._run, name='comment-writer', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, comment):
+        if comment.created_at is None:
+            comment.created_at = timezone.now()
+        # bulk_create не вызывает save(), поэтому имя заполняется здесь.
+        comment.author_username = comment.author.username
+        comment.idempotency_key = uuid.uuid4()
+        self.start()
+        with self._lock:
+            self._append(comment)
+
+    def pending(self, post_id, author_id=None):
+        with self._lock:
+            return [
+                comment for comment in self._pending.get(post_id, ())
+                if author_id is None or comment.author_id == author_id
+            ]
+
+    def flush(self):
+        self._queue.join()
+
+    def _append(self, comment):
+        self._journal.write(self._serialize(comment))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._pending.setdefault(comment.post_id, []).append(comment)
+        self._queue.put(comment)
+
+    def _serialize(self, comment):
+        return json.dumps({
+            'text': comment.text,
+            'post_id': comment.post_id,
+            'author_id': comment.author_id,
+            'author_username': comment.author_username,
+            'created_at': comment.created_at.isoformat(),
+            'idempotency_key': comment.idempotency_key.hex,
+        }) + '\n'
+
+    def _new_journal_path(self):
+        # Имя уникально для каждого запуска: после перезапуска
+        # контейнера PID может совпасть с PID прежнего процесса.
+        path = (self.directory
+                / f'comments-{os.getpid()}-{uuid.uuid4().hex}.jsonl')
+        _own_journals.add(path)
+        return path
+
+    def _claim_orphaned_journals(self):
+        # Журнал забирается атомарным переименованием: из нескольких
+        # процессов, стартующих одновременно, его получит только один.
+        # Если процесс упадёт, не дочитав журнал, тот снова станет
+        # сиротой под новым именем.
+        claimed = []
+        for orphan in self._find_orphaned_journals():
+            path = self._new_journal_path()
+            try:
+                os.rename(orphan, path)
+            except FileNotFoundError:
+                continue
+            claimed.append(path)
+        return claimed
+
+    def _find_orphaned_journals(self):
+        return [
+            path for path in self.directory.glob('comments-*.jsonl')
+            if path not in _own_journals
+            # Чужой журнал с нашим PID остался от прежнего процесса с тем же
+            # номером, например после перезапуска контейнера.
+            and (int(path.stem.split('-')[1]) == os.getpid()
+                 or not _is_alive(int(path.stem.split('-')[1])))
+        ]
+
+    def _read_journal(self, path):
+        with open(path, encoding='utf-8') as journal:
+            for line in journal:
+                record = json.loads(line)
+                record['created_at'] = parse_datetime(record['created_at'])
+                record['idempotency_key'] = uuid.UUID(
+                    record['idempotency_key'])
+                yield Comment(**record)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        close_old_connections()
+        if not self._bulk_create(batch):
+            self._save_one_by_one(batch)
+        with self._lock:
+            for comment in batch:
+                self._pending[comment.post_id].remove(comment)
+                if not self._pending[comment.post_id]:
+                    del self._pending[comment.post_id]
+            self._checkpoint()
+
+    def _checkpoint(self):
+        # Журнал заменяется копией с ещё не записанными комментариями.
+        # Упади процесс до замены, записанная пачка повторится из старого
+        # журнала, и bulk_create пропустит её по idempotency_key.
+        path = self._journal_path.with_name(self._journal_path.name + '.tmp')
+        with open(path, 'w', encoding='utf-8') as journal:
+            for comments in self._pending.values():
+                journal.writelines(map(self._serialize, comments))
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(path, self._journal_path)
+        self._journal.close()
+        self._journal = open(self._journal_path, 'a', encoding='utf-8')
+
+    def _bulk_create(self, batch):
+        for _ in range(self.max_retries):
+            try:
+                Comment.objects.bulk_create(batch, ignore_conflicts=True)
+                return True
+            except IntegrityError:
+                # Пост удалили, пока комментарий ждал записи.
+                return False
+            except DatabaseError:
+                logger.exception('comment batch write failed, retrying')
+                time.sleep(self.flush_interval)
+                close_old_connections()
+        return False
+
+    def _save_one_by_one(self, batch):
+        for comment in batch:
+            try:
+                comment.save()
+            except IntegrityError:
+                if Comment.objects.filter(
+                        idempotency_key=comment.idempotency_key).exists():
+                    # Записан до падения прежнего процесса.
+                    continue
+                logger.warning(
+                    'dropped queued comment to missing post %s',
+                    comment.post_id)
+            except DatabaseError:
+                logger.exception('queued comment moved to failed journal')
+                with open(self.directory / 'failed-comments.jsonl', 'a',
+                          encoding='utf-8') as failed:
+                    failed.write(self._serialize(comment))
+
+
+comment_queue = CommentQueue(
+    getattr(settings, 'COMMENT_QUEUE_DIR',
+            settings.BASE_DIR / 'comment_queue'),
+    batch_size=getattr(settings, 'COMMENT_QUEUE_BATCH_SIZE', 100),
+    flush_interval=getattr(settings, 'COMMENT_QUEUE_FLUSH_INTERVAL', 1.0),
+    max_retries=getattr(settings, 'COMMENT_QUEUE_MAX_RETRIES', 3),
+)
@@ -0,0 +1,74 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (Argon2PasswordHasher,
+                                         PBKDF2PasswordHasher)
+
+PASSWORD_HASHING_WORKERS = getattr(settings, 'PASSWORD_HASHING_WORKERS', 2)
+PASSWORD_HASHING_QUEUE = getattr(settings, 'PASSWORD_HASHING_QUEUE', 16)
+PASSWORD_HASHING_TIMEOUT = getattr(settings, 'PASSWORD_HASHING_TIMEOUT', 0)
+
+_local = threading.local()
+
+
+def _mark_pool_thread():
+    _local.in_pool = True
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASHING_WORKERS,
+    thread_name_prefix='password-hashing',
+    initializer=_mark_pool_thread,
+)
+_slots = threading.BoundedSemaphore(
+    PASSWORD_HASHING_WORKERS + PASSWORD_HASHING_QUEUE)
+
+
+class HashingPoolBusy(Exception):
+    """Пул хеширования и его очередь заняты."""
+
+
+def run_hashing(func, *args, **kwargs):
+    """Выполняет хеширование в ограниченном пуле потоков.
+
+    Если все места в пуле и очереди заняты дольше PASSWORD_HASHING_TIMEOUT
+    секунд (по умолчанию не ждёт вовсе), выбрасывает HashingPoolBusy;
+    HashingPoolMiddleware отвечает на него кодом 503.
+    """
+    if getattr(_local, 'in_pool', False):
+        return func(*args, **kwargs)
+    if PASSWORD_HASHING_TIMEOUT > 0:
+        acquired = _slots.acquire(timeout=PASSWORD_HASHING_TIMEOUT)
+    else:
+        acquired = _slots.acquire(blocking=False)
+    if not acquired:
+        raise HashingPoolBusy('Пул хеширования паролей перегружен')
+    try:
+        return _executor.submit(func, *args, **kwargs).result()
+    finally:
+        _slots.release()
+
+
+class BoundedHasherMixin:
+    """Считает хеши в пуле run_hashing, откуда бы их ни запросили."""
+
+    def encode(self, *args, **kwargs):
+        return run_hashing(super().encode, *args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        return run_hashing(super().verify, *args, **kwargs)
+
+
+class TunedPBKDF2PasswordHasher(BoundedHasherMixin, PBKDF2PasswordHasher):
+    iterations = getattr(
+        settings, 'PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+
+class TunedArgon2PasswordHasher(BoundedHasherMixin, Argon2PasswordHasher):
+    time_cost = getattr(
+        settings, 'ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(
+        settings, 'ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(
+        settings, 'ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
@@ -0,0 +1,64 @@
+"""Кэш маленьких справочников (категории, местоположения) в памяти процесса.
+
+Строки таблицы целиком хранятся в словаре процесса и сверяются с версией
+в кэше 'default'. Изменение сбрасывает словари сразу во всех процессах,
+только если этот кэш общий (Redis, Memcached). С LocMemCache версия видна
+лишь своему процессу, и остальные перечитывают таблицу не позже чем через
+LOOKUP_CACHE_TIMEOUT секунд.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+LOOKUP_CACHE_TIMEOUT = getattr(settings, 'LOOKUP_CACHE_TIMEOUT', 60)
+
+_tables = {}
+
+
+def _version_key(model):
+    return f'blog:lookups:{model._meta.label_lower}:version'
+
+
+def invalidate(model):
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_table(model, reload=False):
+    version = cache.get_or_set(_version_key(model), time.time_ns, None)
+    cached = _tables.get(model)
+    if (
+        reload
+        or cached is None
+        or cached[0] != version
+        or cached[1] < time.monotonic()
+    ):
+        cached = (
+            version,
+            time.monotonic() + LOOKUP_CACHE_TIMEOUT,
+            model._default_manager.in_bulk(),
+        )
+        _tables[model] = cached
+    return cached[2]
+
+
+def attach(objects, field_name):
+    """Подставляет связанные объекты из справочника вместо JOIN."""
+    if not objects:
+        return objects
+    field = objects[0]._meta.get_field(field_name)
+    table = get_table(field.related_model)
+    for obj in objects:
+        pk = getattr(obj, field.attname)
+        if pk is None:
+            continue
+        if pk not in table:
+            # Строку добавили, а сигнал до этого процесса ещё не дошёл.
+            table = get_table(field.related_model, reload=True)
+        if pk in table:
+            field.set_cached_value(obj, table[pk])
+    return objects
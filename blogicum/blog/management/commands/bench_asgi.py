@@ -0,0 +1,125 @@
+import asyncio
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.test import override_settings
+from django.urls import clear_url_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность WSGI, ASGI с синхронными '
+        'представлениями и ASGI с ASYNC_VIEWS при медленных клиентах: '
+        'каждый запрос отправляется и читается с задержкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--latency', type=float, default=0.05,
+            help='Задержка клиента в секундах на отправку и на чтение.')
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков WSGI-сервера.')
+        parser.add_argument(
+            '--concurrency', type=int, default=100,
+            help='Число одновременных соединений с ASGI-приложением.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        total = options['requests']
+        latency = options['latency']
+
+        elapsed = self.run_wsgi(path, total, latency, options['workers'])
+        self.report('WSGI', total, elapsed)
+        for async_views in (False, True):
+            with self.async_views(async_views):
+                elapsed = asyncio.run(self.run_asgi(
+                    path, total, latency, options['concurrency']))
+            self.report(f'ASGI, ASYNC_VIEWS={async_views}', total, elapsed)
+
+    def async_views(self, enabled):
+        # Маршруты выбирают представления при импорте, поэтому модули
+        # URL перезагружаются под нужным значением настройки.
+        command = self
+
+        class Switch(override_settings):
+            def enable(self):
+                super().enable()
+                command.reload_urls()
+
+            def disable(self):
+                super().disable()
+                command.reload_urls()
+
+        return Switch(ASYNC_VIEWS=enabled)
+
+    def reload_urls(self):
+        importlib.reload(importlib.import_module('blog.urls'))
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    def report(self, name, total, elapsed):
+        self.stdout.write(
+            f'{name}: {total} запросов за {elapsed:.2f} с, '
+            f'{total / elapsed:.1f} запросов/с')
+
+    def run_wsgi(self, path, total, latency, workers):
+        application = get_wsgi_application()
+
+        def request(_):
+            environ = {'PATH_INFO': path, 'HTTP_HOST': 'localhost'}
+            setup_testing_defaults(environ)
+            # Поток сервера занят, пока клиент передаёт запрос и читает ответ.
+            time.sleep(latency)
+            response = application(environ, lambda status, headers: None)
+            b''.join(response)
+            response.close()
+            time.sleep(latency)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(request, range(total)))
+        return time.perf_counter() - start
+
+    async def run_asgi(self, path, total, latency, concurrency):
+        application = get_asgi_application()
+        semaphore = asyncio.Semaphore(concurrency)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'root_path': '',
+            'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+
+        async def receive():
+            await asyncio.sleep(latency)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                if not message.get('more_body'):
+                    await asyncio.sleep(latency)
+
+        async def request():
+            async with semaphore:
+                await application(dict(scope), receive, send)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(total)))
+        return time.perf_counter() - start
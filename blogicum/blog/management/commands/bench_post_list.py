@@ -0,0 +1,76 @@
+import re
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine
+from django.template.loader import get_template
+
+from blog.models import Post
+from blog.utils import hydrate_posts
+
+CATEGORY_LINK = re.compile(
+    r'<a class="text-muted" href="\{% blog_url \'category_posts\' .*?</a>',
+    re.DOTALL,
+)
+
+
+def include_chain_engine():
+    # Прежняя схема: отдельный include карточки на каждый пост
+    # и вложенный include ссылки на категорию.
+    source = (settings.TEMPLATES_DIR / 'includes/post_list.html').read_text(
+        encoding='utf-8')
+    card = source.split('{% for post in page_obj %}')[1].split(
+        '{% endfor %}')[0]
+    card = '{% load blog_tags %}' + CATEGORY_LINK.sub(
+        '{% include "includes/category_link.html" %}', card)
+    link = (settings.TEMPLATES_DIR / 'includes/category_link.html').read_text(
+        encoding='utf-8')
+    templates = {
+        'includes/post_list.html': (
+            '{% for post in page_obj %}'
+            '{% include "includes/post_card.html" %}'
+            '{% endfor %}'
+        ),
+        'includes/post_card.html': card,
+        'includes/category_link.html': link,
+    }
+    return Engine(
+        loaders=[('django.template.loaders.cached.Loader', [
+            ('django.template.loaders.locmem.Loader', templates),
+        ])],
+        libraries={'blog_tags': 'blog.templatetags.blog_tags'},
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает рендеринг страницы карточек постов одним шаблоном '
+        'и цепочкой include.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=settings.LIMIT_POSTS)
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        ids = list(Post.published.values_list('pk', flat=True)[
+            :options['posts']])
+        posts = hydrate_posts(Post.published, ids)
+        context = {'page_obj': posts}
+
+        one_pass = get_template('includes/post_list.html')
+        chain = include_chain_engine().get_template('includes/post_list.html')
+        results = (
+            ('Один шаблон', lambda: one_pass.render(context)),
+            ('Цепочка include', lambda: chain.render(Context(context))),
+        )
+        for name, render in results:
+            render()
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                render()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{name}: {elapsed / options["repeat"] * 1000:.3f} мс '
+                f'на страницу из {len(posts)} постов')
@@ -0,0 +1,99 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.test import Client, override_settings
+
+from blog.models import Post
+
+User = get_user_model()
+
+BENCH_USERNAME = 'bench_session_{}'
+
+
+class SessionQueryCounter:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if 'django_session' in sql:
+            with self.lock:
+                if sql.lstrip().upper().startswith('SELECT'):
+                    self.reads += 1
+                else:
+                    self.writes += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает главную страницу и страницу поста запросами '
+        'авторизованных пользователей и сравнивает хранилища сессий.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+', default=list(settings.SESSION_ENGINES),
+            choices=list(settings.SESSION_ENGINES))
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument(
+            '--save-every-request', action='store_true',
+            help='Сохранять сессию на каждом запросе (продление срока).')
+
+    def handle(self, *args, **options):
+        post = Post.published.first()
+        if post is None:
+            raise CommandError('Нужен хотя бы один опубликованный пост.')
+        urls = ['/', f'/posts/{post.pk}/']
+        users = [
+            User.objects.get_or_create(username=BENCH_USERNAME.format(i))[0]
+            for i in range(options['users'])
+        ]
+        try:
+            for profile in options['profiles']:
+                with override_settings(
+                    SESSION_ENGINE=settings.SESSION_ENGINES[profile],
+                    SESSION_SAVE_EVERY_REQUEST=options['save_every_request'],
+                    ALLOWED_HOSTS=['testserver'],
+                ):
+                    self.run_profile(profile, users, urls, options)
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def run_profile(self, profile, users, urls, options):
+        clients = []
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+        counter = SessionQueryCounter()
+        errors = []
+
+        def request(index):
+            client = clients[index % len(clients)]
+            with connection.execute_wrapper(counter):
+                try:
+                    client.get(urls[index % len(urls)])
+                except OperationalError as error:
+                    errors.append(error)
+                finally:
+                    connection.close()
+
+        total = options['requests']
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            list(pool.map(request, range(total)))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{profile}: {total / elapsed:.1f} запросов/с, '
+            f'чтений сессий {counter.reads}, записей {counter.writes}, '
+            f'ошибок блокировки {len(errors)}')
@@ -0,0 +1,128 @@
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.templatetags.blog_tags import CRITICAL_CSS_PATH, TRIMMED_CSS_PATH
+
+SOURCE_CSS_PATH = 'css/bootstrap.min.css'
+
+# Классы, которые django_bootstrap5 добавляет при рендеринге форм и кнопок.
+SAFELIST = {
+    'alert', 'alert-danger', 'alert-dismissible', 'btn', 'btn-close',
+    'btn-primary', 'fade', 'form-check', 'form-check-input',
+    'form-check-label', 'form-control', 'form-label', 'form-select',
+    'form-text', 'input-group', 'input-group-text', 'invalid-feedback',
+    'is-invalid', 'is-valid', 'mb-3', 'show', 'text-danger',
+    'valid-feedback',
+}
+# Шаблоны первого экрана: их классы встраиваются в страницу.
+ABOVE_THE_FOLD_TEMPLATES = (
+    'base.html', 'includes/header.html', 'includes/post_list.html',
+)
+# Блоки, которые сохраняются целиком.
+KEEP_AT_RULES = ('@font-face', '@keyframes', '@-webkit-keyframes')
+
+CLASS_ATTR = re.compile(r'class="([^"]*)"')
+TEMPLATE_TAG = re.compile(r'{%.*?%}|{{.*?}}')
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+LICENSE_COMMENT = re.compile(r'/\*!.*?\*/', re.DOTALL)
+CSS_CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+
+
+def find_used_classes(templates_dir, names=None):
+    if names is None:
+        classes = set(SAFELIST)
+        paths = Path(templates_dir).rglob('*.html')
+    else:
+        classes = set()
+        paths = [Path(templates_dir) / name for name in names]
+    for path in paths:
+        for value in CLASS_ATTR.findall(path.read_text(encoding='utf-8')):
+            classes.update(TEMPLATE_TAG.sub(' ', value).split())
+    return classes
+
+
+def split_blocks(css):
+    """Разбивает CSS на пары (прелюдия, тело) верхнего уровня."""
+    blocks = []
+    depth = 0
+    start = 0
+    prelude = ''
+    for index, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                # Отбрасываем инструкции вроде @charset "UTF-8";
+                prelude = css[start:index].rsplit(';', 1)[-1].strip()
+                start = index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((prelude, css[start:index]))
+                start = index + 1
+    return blocks
+
+
+def split_selectors(prelude):
+    selectors = []
+    depth = 0
+    current = []
+    for char in prelude:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(''.join(current))
+            current = []
+            continue
+        current.append(char)
+    selectors.append(''.join(current))
+    return selectors
+
+
+def trim_css(css, used_classes):
+    result = []
+    for prelude, body in split_blocks(css):
+        if prelude.startswith(KEEP_AT_RULES):
+            result.append(f'{prelude}{{{body}}}')
+        elif prelude.startswith(('@media', '@supports')):
+            inner = trim_css(body, used_classes)
+            if inner:
+                result.append(f'{prelude}{{{inner}}}')
+        elif not prelude.startswith('@'):
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if set(CSS_CLASS.findall(selector)) <= used_classes
+            ]
+            if selectors:
+                result.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(result)
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает урезанный Bootstrap только с классами, которые '
+        'используются в шаблонах, и CSS первого экрана из него; base.html '
+        'встраивает второй в страницу и подключает первый отдельным файлом.'
+    )
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        source = (static_dir / SOURCE_CSS_PATH).read_text(encoding='utf-8')
+        license = LICENSE_COMMENT.search(source)
+        source = CSS_COMMENT.sub('', source)
+        for path, names in (
+            (TRIMMED_CSS_PATH, None),
+            (CRITICAL_CSS_PATH, ABOVE_THE_FOLD_TEMPLATES),
+        ):
+            used_classes = find_used_classes(settings.TEMPLATES_DIR, names)
+            trimmed = trim_css(source, used_classes)
+            if license:
+                trimmed = license.group() + trimmed
+            (static_dir / path).write_text(trimmed, encoding='utf-8')
+            self.stdout.write(
+                f'{path}: {len(trimmed)} байт, '
+                f'классов в шаблонах: {len(used_classes)}')
@@ -0,0 +1,22 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import timeline
+
+
+class Command(BaseCommand):
+    help = (
+        'Добавляет в ленты посты, у которых наступило время публикации. '
+        'Запускается периодически, например из cron. Требует общего кэша '
+        'лент; с LocMemCache отложенные посты появляются при пересборке '
+        'лент раз в TIMELINE_TIMEOUT секунд.'
+    )
+
+    def handle(self, *args, **options):
+        if isinstance(caches[timeline.TIMELINE_CACHE], LocMemCache):
+            raise CommandError(
+                'Кэш лент TIMELINE_CACHE хранится в памяти процесса: '
+                'команда не увидит ленты веб-процессов.')
+        count = timeline.fan_out_due_posts()
+        self.stdout.write(f'В ленты добавлено постов: {count}')
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.utils import preload_templates
+
+
+class Command(BaseCommand):
+    help = 'Разбирает и кэширует все шаблоны проекта.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help='Сравнить время первой и повторной загрузки шаблонов.')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        names = preload_templates()
+        cold = time.perf_counter() - start
+        self.stdout.write(f'Загружено шаблонов: {len(names)}')
+        if not options['benchmark']:
+            return
+
+        start = time.perf_counter()
+        preload_templates()
+        warm = time.perf_counter() - start
+        self.stdout.write(
+            f'Первая загрузка: {cold * 1000:.1f} мс, '
+            f'из кэша: {warm * 1000:.1f} мс')
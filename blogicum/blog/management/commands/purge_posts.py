@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Category, Comment, Post
+from blog.purge import PURGE_CHUNK_SIZE, purge_comments, purge_posts
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет посты автора или категории вместе с комментариями '
+        'порциями, не загружая их в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='Имя пользователя.')
+        parser.add_argument('--category', help='Слаг категории.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=PURGE_CHUNK_SIZE)
+        parser.add_argument(
+            '--delete-owner', action='store_true',
+            help='Затем удалить самого автора или категорию.')
+
+    def progress(self, label):
+        def report(deleted):
+            self.stdout.write(f'{label}: удалено {deleted}')
+        return report
+
+    def handle(self, *args, **options):
+        if bool(options['author']) == bool(options['category']):
+            raise CommandError('Укажите ровно один из --author, --category.')
+        chunk_size = options['chunk_size']
+
+        if options['author']:
+            try:
+                owner = User.objects.get(username=options['author'])
+            except User.DoesNotExist:
+                raise CommandError('Пользователь не найден.')
+            posts = Post.objects.filter(author=owner)
+        else:
+            try:
+                owner = Category.objects.get(slug=options['category'])
+            except Category.DoesNotExist:
+                raise CommandError('Категория не найдена.')
+            posts = Post.objects.filter(category=owner)
+
+        deleted = purge_posts(posts, chunk_size, self.progress('Посты'))
+        if options['author']:
+            purge_comments(
+                Comment.objects.filter(author=owner), chunk_size,
+                self.progress('Комментарии'))
+        if options['delete_owner']:
+            owner.delete()
+        self.stdout.write(
+            self.style.SUCCESS(f'Всего удалено постов: {deleted}'))
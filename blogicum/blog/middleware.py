@@ -0,0 +1,226 @@
+import hashlib
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+from django.utils.text import compress_string
+
+from blog.hashers import HashingPoolBusy
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger('blog.performance')
+
+PRESERVED_BLOCK = re.compile(
+    r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+WHITESPACE = re.compile(r'\s{2,}')
+
+MIN_COMPRESS_LENGTH = 200
+
+USER_CACHE_TIMEOUT = getattr(settings, 'USER_CACHE_TIMEOUT', 300)
+
+
+def accepts_encoding(request, encoding):
+    """Проверяет, принимает ли клиент сжатие encoding.
+
+    Кодировка с q=0 в Accept-Encoding запрещена, как и не указанная
+    явно, если для * задано q=0.
+    """
+    weights = {}
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+    return weights.get(encoding, weights.get('*', 0.0)) > 0
+
+
+def _collapse(match):
+    return '\n' if '\n' in match.group() else ' '
+
+
+def minify_html(html):
+    # Пробелы внутри pre, textarea, script и style значимы и не трогаются;
+    # остальные серии пробелов сжимаются до одного символа.
+    parts = []
+    position = 0
+    for match in PRESERVED_BLOCK.finditer(html):
+        parts.append(WHITESPACE.sub(_collapse, html[position:match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(WHITESPACE.sub(_collapse, html[position:]))
+    return ''.join(parts)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else request.path
+
+
+class HtmlMinifyMiddleware(MiddlewareMixin):
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'HTML_MINIFY', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or 'text/html' not in response.get('Content-Type', '')
+        ):
+            return response
+        start = time.perf_counter()
+        original_length = len(response.content)
+        response.content = minify_html(
+            response.content.decode(response.charset))
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
+        logger.info(
+            'minify %s: %d -> %d bytes, %.2f ms', _view_name(request),
+            original_length, len(response.content),
+            (time.perf_counter() - start) * 1000)
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'RESPONSE_COMPRESSION', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.brotli_quality = getattr(settings, 'BROTLI_QUALITY', 5)
+        self.cache_timeout = getattr(
+            settings, 'COMPRESSED_CACHE_TIMEOUT', 300)
+
+    def get_encoding(self, request):
+        if brotli is not None and accepts_encoding(request, 'br'):
+            return 'br'
+        if accepts_encoding(request, 'gzip'):
+            return 'gzip'
+        return None
+
+    def compress(self, content, encoding):
+        if encoding == 'br':
+            return brotli.compress(content, quality=self.brotli_quality)
+        return compress_string(content)
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < MIN_COMPRESS_LENGTH
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.get_encoding(request)
+        if encoding is None:
+            return response
+
+        start = time.perf_counter()
+        # Страницы без cookie одинаковы для всех клиентов, их сжатый
+        # вариант переиспользуется по хешу содержимого.
+        cacheable = not response.cookies
+        key = 'blog:compressed:{}:{}'.format(
+            encoding, hashlib.md5(response.content).hexdigest())
+        compressed = cache.get(key) if cacheable else None
+        if compressed is None:
+            compressed = self.compress(response.content, encoding)
+            if cacheable:
+                cache.set(key, compressed, self.cache_timeout)
+        if len(compressed) >= len(response.content):
+            return response
+
+        logger.info(
+            '%s %s: %d -> %d bytes, %.2f ms', encoding, _view_name(request),
+            len(response.content), len(compressed),
+            (time.perf_counter() - start) * 1000)
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+def user_cache_key(user_id):
+    return f'blog:user:{user_id}'
+
+
+def get_cached_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = _load_user(request)
+    return request._cached_user
+
+
+def _load_user(request):
+    user_id = request.session.get(auth.SESSION_KEY)
+    if user_id is None:
+        return auth.get_user(request)
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    # Хеш сессии сверяется так же, как в auth.get_user: после смены
+    # пароля закэшированный пользователь не подойдёт.
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if (
+        user is not None
+        and session_hash
+        and constant_time_compare(session_hash, user.get_session_auth_hash())
+    ):
+        return user
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, user, USER_CACHE_TIMEOUT)
+    return user
+
+
+class CachedAuthenticationMiddleware(MiddlewareMixin):
+    """Берёт пользователя из кэша вместо запроса к auth_user.
+
+    Включается настройкой CACHED_AUTH_USER и ставится после
+    AuthenticationMiddleware. Требует общего для всех процессов кэша
+    'default': сигнал сбрасывает пользователя только в кэше своего
+    процесса (см. проверку blog.W001).
+    """
+
+    def __init__(self, get_response=None):
+        if not getattr(settings, 'CACHED_AUTH_USER', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
+
+
+class HashingPoolMiddleware(MiddlewareMixin):
+    """Отвечает 503, когда пул хеширования паролей переполнен."""
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingPoolBusy):
+            return None
+        logger.warning('password hashing pool is saturated')
+        response = HttpResponse(
+            'Сервис перегружен, попробуйте позже.', status=503)
+        response['Retry-After'] = '1'
+        return response
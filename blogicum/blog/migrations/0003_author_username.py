@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_author_username(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    username = Subquery(
+        User.objects.filter(pk=OuterRef('author_id')).values('username')[:1])
+    for model_name in ('Post', 'Comment'):
+        apps.get_model('blog', model_name).objects.update(
+            author_username=username)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_comment_is_published'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='author_username',
+            field=models.CharField(blank=True, editable=False, max_length=150, verbose_name='Имя автора'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='author_username',
+            field=models.CharField(blank=True, editable=False, max_length=150, verbose_name='Имя автора'),
+        ),
+        migrations.RunPython(fill_author_username, migrations.RunPython.noop),
+    ]
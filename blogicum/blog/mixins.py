@@ -13,9 +13,14 @@ class PostMixin:
 
 class AuthorRequiredMixin(UserPassesTestMixin):
 
+    def get_object(self, queryset=None):
+        # Объект уже загружен в test_func, повторный запрос не нужен.
+        if not hasattr(self, '_author_checked_object'):
+            self._author_checked_object = super().get_object(queryset)
+        return self._author_checked_object
+
     def test_func(self):
-        obj = self.get_object()
-        return obj.author == self.request.user
+        return self.get_object().author_id == self.request.user.id
 
     def handle_no_permission(self):
         return redirect('blog:post_detail', self.kwargs['post_id'])
@@ -1,10 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
 from django.db import models
-from django.urls import reverse
 from django.utils import timezone
 
 from blog.managers import PublishedManager
+from blog.routes import blog_url
 from blogicum.constants import MAX_LENGTH_NAME, MAX_STR_LENGTH, MAX_TEXT_LENGTH
 
 
@@ -27,6 +27,28 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class AuthorUsernameModel(models.Model):
+    """Хранит копию имени автора, чтобы списки не соединяли auth_user."""
+
+    author_username = models.CharField(
+        max_length=150,
+        blank=True,
+        editable=False,
+        verbose_name='Имя автора'
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if (
+            not self.author_username
+            or self._meta.get_field('author').is_cached(self)
+        ):
+            self.author_username = self.author.username
+        super().save(*args, **kwargs)
+
+
 class Location(BaseModel):
     name = models.CharField(
         max_length=MAX_LENGTH_NAME,
@@ -72,7 +94,7 @@ class Category(BaseModel):
     short_description.admin_order_field = 'description'
 
 
-class Post(BaseModel):
+class Post(AuthorUsernameModel, BaseModel):
     title = models.CharField(
         max_length=MAX_LENGTH_NAME,
         verbose_name='Заголовок'
@@ -123,11 +145,10 @@ class Post(BaseModel):
         return f'{self.title[:MAX_STR_LENGTH]}'
 
     def get_absolute_url(self):
-        return reverse(
-            'blog:profile', kwargs={'username': self.author.username})
+        return blog_url('profile', self.author_username)
 
 
-class Comment(models.Model):
+class Comment(AuthorUsernameModel):
     text = models.TextField('Текст комментария')
     post = models.ForeignKey(
         Post,
@@ -142,11 +163,29 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name='comments',
     )
+    is_published = models.BooleanField(
+        default=True,
+        verbose_name='Опубликовано',
+        help_text='Снимите галочку, чтобы скрыть комментарий.'
+    )
+    # Ключ комментария из очереди отложенной записи: повторная запись
+    # пачки из журнала не создаёт дублей.
+    idempotency_key = models.UUIDField(
+        null=True,
+        unique=True,
+        editable=False,
+    )
 
     class Meta:
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('post', 'is_published', 'created_at'),
+                name='comment_post_published_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text
@@ -0,0 +1,53 @@
+from django.db import router, transaction
+
+from blog import timeline
+from blog.cache import invalidate_posts
+from blog.models import Comment, Post
+
+PURGE_CHUNK_SIZE = 500
+
+
+def _raw_delete(queryset):
+    # Минуя Collector: объекты не загружаются в память, сигналы не
+    # отправляются, поэтому кэши сбрасываются вручную.
+    return queryset._raw_delete(queryset.db)
+
+
+def purge_posts(queryset, chunk_size=PURGE_CHUNK_SIZE, progress=None):
+    """Удаляет посты выборки вместе с комментариями порциями.
+
+    Каждая порция удаляется в своей транзакции, так что база не
+    блокируется на всё время удаления. progress, если передан,
+    вызывается с числом уже удалённых постов после каждой порции.
+    """
+    deleted = 0
+    queryset = queryset.order_by('pk').values_list('pk', 'category_id')
+    while True:
+        chunk = list(queryset[:chunk_size])
+        if not chunk:
+            return deleted
+        post_ids = [post_id for post_id, _ in chunk]
+        with transaction.atomic(using=router.db_for_write(Post)):
+            _raw_delete(Comment.objects.filter(post_id__in=post_ids))
+            deleted += _raw_delete(Post.objects.filter(pk__in=post_ids))
+        invalidate_posts()
+        if timeline.TIMELINE_FANOUT:
+            for category_id in {category_id for _, category_id in chunk}:
+                timeline.reset(category_id)
+        if progress is not None:
+            progress(deleted)
+
+
+def purge_comments(queryset, chunk_size=PURGE_CHUNK_SIZE, progress=None):
+    """Удаляет комментарии выборки порциями."""
+    deleted = 0
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    while True:
+        comment_ids = list(queryset[:chunk_size])
+        if not comment_ids:
+            return deleted
+        with transaction.atomic(using=router.db_for_write(Comment)):
+            deleted += _raw_delete(Comment.objects.filter(pk__in=comment_ids))
+        invalidate_posts()
+        if progress is not None:
+            progress(deleted)
@@ -0,0 +1,83 @@
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+logger = logging.getLogger('blog.performance')
+
+RATE_LIMITS = getattr(settings, 'RATE_LIMITS', {})
+
+TOO_MANY_REQUESTS = 429
+
+
+def _client_id(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR")}'
+
+
+def _count_request(key, timeout):
+    if cache.add(key, 1, timeout):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Счётчик истёк между add и incr.
+        cache.add(key, 0, timeout)
+        return cache.incr(key)
+
+
+def take_token(scope, request):
+    """Учитывает запрос клиента; False, если лимит исчерпан.
+
+    Скользящее окно приближается двумя фиксированными: вес прошлого окна
+    убывает по мере того, как идёт текущее. Счётчики увеличиваются
+    атомарно через cache.add и cache.incr, поэтому одновременные запросы
+    одного клиента не проходят сверх лимита.
+    """
+    limit, period = RATE_LIMITS[scope]
+    now = time.time()
+    window = int(now // period)
+    key = f'blog:ratelimit:{scope}:{_client_id(request)}'
+    count = _count_request(f'{key}:{window}', period * 2)
+    previous = cache.get(f'{key}:{window - 1}', 0)
+    weight = 1 - (now % period) / period
+    return previous * weight + count <= limit
+
+
+def get_rejected_count(scope):
+    return cache.get(f'blog:ratelimit:rejected:{scope}', 0)
+
+
+def _reject(scope, request):
+    key = f'blog:ratelimit:rejected:{scope}'
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+    logger.warning(
+        'rate limit %s exceeded by %s', scope, _client_id(request))
+    return HttpResponse(
+        'Слишком много запросов, попробуйте позже.',
+        status=TOO_MANY_REQUESTS,
+    )
+
+
+def rate_limit(scope, methods=('POST',)):
+    """Ограничивает частоту запросов по RATE_LIMITS[scope].
+
+    Отказ выдаётся до валидации формы и обращений к базе данных.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                scope in RATE_LIMITS
+                and request.method in methods
+                and not take_token(scope, request)
+            ):
+                return _reject(scope, request)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
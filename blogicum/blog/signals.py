@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from blog import lookups, timeline
+from blog.cache import invalidate_posts
+from blog.middleware import user_cache_key
+from blog.models import Category, Comment, Location, Post, Profile
+from blog.utils import schedule_author_rename
+
+User = get_user_model()
+
+
+@receiver((post_save, post_delete), sender=Post)
+@receiver((post_save, post_delete), sender=Category)
+def invalidate_post_lists(**kwargs):
+    invalidate_posts()
+
+
+@receiver((post_save, post_delete), sender=Location)
+@receiver((post_save, post_delete), sender=Category)
+def invalidate_lookup_table(sender, **kwargs):
+    lookups.invalidate(sender)
+
+
+@receiver(pre_save, sender=Post)
+def remember_timeline_position(sender, instance, **kwargs):
+    if timeline.TIMELINE_FANOUT and instance.pk is not None:
+        instance._old_timeline_position = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('category_id', 'pub_date').first()
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, **kwargs):
+    if timeline.TIMELINE_FANOUT:
+        position = getattr(instance, '_old_timeline_position', None)
+        timeline.fan_out(instance, *position or ())
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_timelines(sender, instance, **kwargs):
+    if timeline.TIMELINE_FANOUT:
+        timeline.remove(instance)
+
+
+@receiver((post_save, post_delete), sender=Category)
+def reset_category_timelines(sender, instance, **kwargs):
+    if timeline.TIMELINE_FANOUT:
+        timeline.reset(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    cache.delete_many([
+        user_cache_key(instance.pk),
+        make_template_fragment_key('profile_header', [instance.pk]),
+    ])
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    # Без запроса к базе: имя берётся из только что загруженных полей.
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def sync_author_username(sender, instance, created, raw=False, **kwargs):
+    old_username = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if not created and not raw and old_username not in (
+            None, instance.username):
+        schedule_author_rename(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def fill_author_username(sender, instance, raw=False, using=None, **kwargs):
+    # loaddata сохраняет объекты в обход save(): имя автора, которого нет
+    # в фикстуре, берётся из той же базы, куда идёт загрузка.
+    if raw and not instance.author_username:
+        author = User.objects.using(using).filter(pk=instance.author_id)
+        instance.author_username = author.values_list(
+            'username', flat=True).first() or ''
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Profile.objects.create(user=instance)
+
+
+@receiver((post_save, post_delete), sender=Profile)
+def invalidate_profile_header(sender, instance, **kwargs):
+    cache.delete(
+        make_template_fragment_key('profile_header', [instance.user_id]))
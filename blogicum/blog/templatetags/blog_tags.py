@@ -0,0 +1,59 @@
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+
+from blog import routes
+
+CRITICAL_CSS_PATH = 'css/bootstrap.critical.css'
+TRIMMED_CSS_PATH = 'css/bootstrap.trimmed.css'
+
+# Прочитанные файлы стилей; отсутствующие не запоминаются, чтобы
+# собранный позже build_critical_css подхватился без перезапуска.
+_static_css = {}
+
+register = template.Library()
+
+
+@register.simple_tag
+def blog_url(name, *args):
+    return routes.blog_url(name, *args)
+
+
+@register.simple_tag
+def page_range(page_obj, on_each_side=2, on_ends=1):
+    paginator = page_obj.paginator
+    if getattr(paginator, 'is_estimated', False):
+        # Число страниц приблизительное: последние страницы не показываем.
+        on_ends = 0
+    return paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends)
+
+
+def read_critical_css():
+    if CRITICAL_CSS_PATH not in _static_css:
+        path = finders.find(CRITICAL_CSS_PATH)
+        if path is None:
+            return None
+        with open(path, encoding='utf-8') as css:
+            _static_css[CRITICAL_CSS_PATH] = css.read()
+    return _static_css[CRITICAL_CSS_PATH]
+
+
+@register.simple_tag
+def critical_css():
+    # Встраивается только CSS первого экрана, урезанный Bootstrap целиком
+    # подгружается файлом с хешем в имени, не блокируя отрисовку.
+    # Без собранного build_critical_css подключаем полный Bootstrap.
+    css = read_critical_css()
+    if css is None:
+        return bootstrap_css()
+    href = static(TRIMMED_CSS_PATH)
+    return format_html(
+        '<style>{}</style>'
+        '<link rel="stylesheet" href="{}" media="print" '
+        'onload="this.media=\'all\'">'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(css), href, href)
@@ -0,0 +1,310 @@
+import bisect
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+TIMELINE_FANOUT = getattr(settings, 'TIMELINE_FANOUT', False)
+TIMELINE_CACHE = getattr(settings, 'TIMELINE_CACHE', 'default')
+# Ленты пересобираются не реже этого интервала: так в них попадают
+# отложенные посты, даже если fanout_due_posts не видит кэш процесса.
+TIMELINE_TIMEOUT = getattr(settings, 'TIMELINE_TIMEOUT', 300)
+# В кэше хранятся только первые TIMELINE_LENGTH постов ленты кусками
+# примерно по TIMELINE_CHUNK_SIZE; страницы дальше читаются из базы.
+TIMELINE_LENGTH = getattr(settings, 'TIMELINE_LENGTH', 1000)
+TIMELINE_CHUNK_SIZE = getattr(settings, 'TIMELINE_CHUNK_SIZE', 100)
+# Блокировка ленты снимается сама, если её владелец упал.
+LOCK_TIMEOUT = 5
+
+LAST_FANOUT_KEY = 'blog:timeline:last_fanout'
+
+
+def _key(category_id=None):
+    if category_id is None:
+        return 'blog:timeline:global'
+    return f'blog:timeline:category:{category_id}'
+
+
+def _entry(post_id, pub_date):
+    # Ленты хранятся по возрастанию, чтобы работал bisect;
+    # ключ сортировки отрицательный, поэтому новые посты идут первыми.
+    return (-pub_date.timestamp(), -post_id)
+
+
+def _is_visible(post):
+    return (
+        post.is_published
+        and post.pub_date <= timezone.now()
+        and post.category_id is not None
+        and post.category.is_published
+    )
+
+
+def _posts(category_id=None):
+    posts = Post.published.order_by('-pub_date', '-pk')
+    if category_id is not None:
+        posts = posts.filter(category_id=category_id)
+    return posts
+
+
+@contextmanager
+def _locked(cache, key, wait=True):
+    # cache.add атомарен во всех бэкендах, поэтому ленту меняет только
+    # один процесс. Без ожидания блок получает False, если лента занята.
+    lock, token = f'{key}:lock', uuid.uuid4().hex
+    while not cache.add(lock, token, LOCK_TIMEOUT):
+        if not wait:
+            yield False
+            return
+        time.sleep(0.01)
+    try:
+        yield True
+    finally:
+        if cache.get(lock) == token:
+            cache.delete(lock)
+
+
+def _chunk_keys(header):
+    return [chunk_key for chunk_key, *_ in header['chunks']]
+
+
+def _make_chunks(key, entries):
+    """Режет записи на куски; возвращает описания кусков и их значения."""
+    chunks, values = [], {}
+    for start in range(0, len(entries), TIMELINE_CHUNK_SIZE):
+        items = entries[start:start + TIMELINE_CHUNK_SIZE]
+        chunk_key = f'{key}:chunk:{uuid.uuid4().hex}'
+        chunks.append((chunk_key, items[0], items[-1], len(items)))
+        values[chunk_key] = items
+    return chunks, values
+
+
+def _store(cache, key, header, values, old_header=None):
+    # Куски живут дольше, чем лента считается свежей, а заменённые
+    # удаляются сразу: читатель со старым заголовком не найдёт кусок
+    # и просто пересоберёт ленту.
+    timeout = 2 * TIMELINE_TIMEOUT
+    cache.set_many(values, timeout)
+    cache.set(key, header, timeout)
+    if old_header is not None:
+        cache.delete_many(
+            set(_chunk_keys(old_header)) - set(_chunk_keys(header)))
+
+
+def _drop(cache, key):
+    header = cache.get(key)
+    cache.delete_many([key] + (_chunk_keys(header) if header else []))
+
+
+def rebuild(category_id=None):
+    posts = _posts(category_id)
+    entries = [
+        _entry(pk, pub_date)
+        for pub_date, pk in posts.values_list('pub_date', 'pk')[
+            :TIMELINE_LENGTH]
+    ]
+    count = len(entries)
+    if count == TIMELINE_LENGTH:
+        count = posts.count()
+    key = _key(category_id)
+    chunks, values = _make_chunks(key, entries)
+    # Время сборки хранится в заголовке, чтобы обновления в _update
+    # не продлевали жизнь ленты.
+    header = {'built': time.time(), 'count': count, 'chunks': chunks}
+    cache = caches[TIMELINE_CACHE]
+    with _locked(cache, key, wait=False) as locked:
+        # Занятую ленту сейчас меняет писатель; собранная лента
+        # отдаётся читателю без сохранения.
+        if locked:
+            _store(cache, key, header, values, cache.get(key))
+    return header, entries
+
+
+def _read(cache, header, start, stop):
+    """Читает из кэша только куски, на которые приходится [start, stop)."""
+    keys, offset, first = [], 0, None
+    for chunk_key, _, _, length in header['chunks']:
+        if offset < stop and offset + length > start:
+            if first is None:
+                first = offset
+            keys.append(chunk_key)
+        offset += length
+    if not keys:
+        return []
+    values = cache.get_many(keys)
+    if len(values) != len(keys):
+        return None
+    entries = [entry for chunk_key in keys for entry in values[chunk_key]]
+    return entries[start - first:stop - first]
+
+
+def _get_header(cache, category_id):
+    header = cache.get(_key(category_id))
+    if header is None or header['built'] + TIMELINE_TIMEOUT < time.time():
+        return None
+    return header
+
+
+def get_count(category_id=None):
+    header = _get_header(caches[TIMELINE_CACHE], category_id)
+    if header is None:
+        header, _ = rebuild(category_id)
+    return header['count']
+
+
+def get_post_ids(category_id, start, stop):
+    cache = caches[TIMELINE_CACHE]
+    header = _get_header(cache, category_id)
+    entries = None
+    if header is not None:
+        entries = _read(cache, header, start, stop)
+    if entries is None:
+        header, entries = rebuild(category_id)
+        entries = entries[start:stop]
+    ids = [-pk for _, pk in entries]
+    stored = sum(length for *_, length in header['chunks'])
+    if stop > stored and header['count'] > stored:
+        # Страницы старше сохранённой части ленты читаются из базы.
+        ids += _posts(category_id).values_list('pk', flat=True)[
+            max(start, stored):stop]
+    return ids
+
+
+def _locate(chunks, entry):
+    firsts = [first for _, first, _, _ in chunks]
+    return max(bisect.bisect_right(firsts, entry) - 1, 0)
+
+
+def _discard(chunk, entry):
+    position = bisect.bisect_left(chunk, entry)
+    if position < len(chunk) and chunk[position] == entry:
+        del chunk[position]
+        return True
+    return False
+
+
+def _insert(chunk, entry):
+    position = bisect.bisect_left(chunk, entry)
+    if position < len(chunk) and chunk[position] == entry:
+        return False
+    chunk.insert(position, entry)
+    return True
+
+
+def _rechunk(key, chunks, items):
+    """Заменяет изменённые куски новыми; разросшийся кусок делится."""
+    new_chunks, values = [], {}
+    for i, chunk in enumerate(chunks):
+        if i not in items:
+            new_chunks.append(chunk)
+            continue
+        entries = items[i]
+        size = len(entries)
+        if size > 2 * TIMELINE_CHUNK_SIZE:
+            size = (size + 1) // 2
+        for start in range(0, len(entries), size or 1):
+            part = entries[start:start + size]
+            chunk_key = f'{key}:chunk:{uuid.uuid4().hex}'
+            new_chunks.append((chunk_key, part[0], part[-1], len(part)))
+            values[chunk_key] = part
+    return new_chunks, values
+
+
+def _update(key, old_entry=None, entry=None):
+    """Убирает из ленты old_entry и добавляет entry.
+
+    Меняются только куски, куда попадают записи, и заголовок. Если
+    запись лежит за обрезанным хвостом ленты, число постов в ней
+    неизвестно, и лента сбрасывается.
+    """
+    cache = caches[TIMELINE_CACHE]
+    with _locked(cache, key):
+        header = cache.get(key)
+        if header is None or (not header['chunks'] and entry is None):
+            return
+        chunks = header['chunks'] or [(None, entry, entry, 0)]
+        count = header['count']
+        stored = sum(length for *_, length in chunks)
+        changes = [item for item in (old_entry, entry) if item is not None]
+        if count > stored and max(changes) > chunks[-1][2]:
+            _drop(cache, key)
+            return
+
+        indexes = {_locate(chunks, item) for item in changes}
+        if entry is not None and stored >= TIMELINE_LENGTH:
+            indexes.add(len(chunks) - 1)
+        keys = [chunks[i][0] for i in indexes if chunks[i][0] is not None]
+        values = cache.get_many(keys)
+        if len(values) != len(keys):
+            _drop(cache, key)
+            return
+        items = {i: list(values.get(chunks[i][0], ())) for i in indexes}
+
+        if old_entry is not None and _discard(
+                items[_locate(chunks, old_entry)], old_entry):
+            count -= 1
+            stored -= 1
+        if entry is not None and _insert(
+                items[_locate(chunks, entry)], entry):
+            count += 1
+            stored += 1
+        if stored > TIMELINE_LENGTH:
+            # Лента обрезается с хвоста; пост остаётся в базе и в count.
+            items[len(chunks) - 1].pop()
+
+        chunks, values = _rechunk(key, chunks, items)
+        _store(cache, key, {**header, 'count': count, 'chunks': chunks},
+               values, header)
+
+
+def remove(post):
+    entry = _entry(post.pk, post.pub_date)
+    _update(_key(), entry)
+    if post.category_id is not None:
+        _update(_key(post.category_id), entry)
+
+
+def fan_out(post, old_category_id=None, old_pub_date=None):
+    old_entry = _entry(post.pk, old_pub_date or post.pub_date)
+    entry = _entry(post.pk, post.pub_date) if _is_visible(post) else None
+    _update(_key(), old_entry, entry)
+    if old_category_id is not None and old_category_id != post.category_id:
+        _update(_key(old_category_id), old_entry)
+    if post.category_id is not None:
+        _update(_key(post.category_id), old_entry, entry)
+
+
+def _reset(*keys):
+    cache = caches[TIMELINE_CACHE]
+    for key in set(keys):
+        with _locked(cache, key):
+            _drop(cache, key)
+
+
+def reset(category_id=None):
+    _reset(_key(), _key(category_id))
+
+
+def fan_out_due_posts():
+    cache = caches[TIMELINE_CACHE]
+    now = timezone.now()
+    since = cache.get(LAST_FANOUT_KEY)
+    cache.set(LAST_FANOUT_KEY, now, None)
+    if since is None:
+        # Без отметки о прошлом запуске ленты проще собрать заново.
+        _reset(_key(), *[
+            _key(pk) for pk in Category.objects.values_list('pk', flat=True)
+        ])
+        return 0
+    posts = Post.published.select_related('category').filter(
+        pub_date__gt=since, pub_date__lte=now)
+    count = 0
+    for post in posts.iterator():
+        fan_out(post)
+        count += 1
+    return count
@@ -1,16 +1,27 @@
+from django.conf import settings
 from django.urls import path
-from blog import views
+from blog import async_views, views
 
 app_name = 'blog'
 
+ASYNC_VIEWS = getattr(settings, 'ASYNC_VIEWS', False)
+
 urlpatterns = [
-    path('', views.index, name='index'),
+    path(
+        '',
+        async_views.index if ASYNC_VIEWS else views.index,
+        name='index',
+    ),
     path(
         'category/<slug:category_slug>/',
-        views.category_posts,
+        async_views.category_posts if ASYNC_VIEWS else views.category_posts,
         name='category_posts',
     ),
-    path('profile/<str:username>/', views.profile_view, name='profile'),
+    path(
+        'profile/<str:username>/',
+        async_views.profile_view if ASYNC_VIEWS else views.profile_view,
+        name='profile',
+    ),
     path(
         'profile/<str:username>/edit_profile/',
         views.ProfileUpdateView.as_view(),
@@ -20,7 +31,10 @@ urlpatterns = [
     path('posts/create/', views.PostCreateView.as_view(), name='create_post'),
     path(
         'posts/<int:post_id>/',
-        views.PostDetailView.as_view(),
+        (
+            async_views.post_detail if ASYNC_VIEWS
+            else views.PostDetailView.as_view()
+        ),
         name='post_detail',
     ),
     path(
@@ -1,7 +1,180 @@
+import hashlib
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.db import DatabaseError, connection, transaction
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+from django.template.loader import get_template
+from django.utils.functional import cached_property
 
+from blog import cache, lookups, timeline
+from blog.models import Comment, Post
 from blogicum.settings import LIMIT_POSTS
 
+logger = logging.getLogger('blog.performance')
+
+RENAME_RETRIES = 3
+
+# Очередь переименований авторов и поток, который её разбирает.
+_renames = queue.Queue()
+_rename_lock = threading.Lock()
+_rename_thread = None
+
+
+def hydrate_posts(queryset, ids):
+    posts = queryset.annotate(
+        comment_count=Count(
+            'comments', filter=Q(comments__is_published=True))
+    ).in_bulk(ids)
+    posts = [posts[pk] for pk in ids if pk in posts]
+    lookups.attach(posts, 'category')
+    lookups.attach(posts, 'location')
+    return posts
+
+
+class EstimatedCountPaginator(Paginator):
+    """Считает строки точно только до порога EXACT_COUNT_THRESHOLD."""
+
+    def get_count_key(self):
+        return hashlib.md5(str(self.object_list.query).encode()).hexdigest()
+
+    @cached_property
+    def count(self):
+        return cache.count_rows(self.object_list, self.get_count_key())
+
+    @property
+    def is_estimated(self):
+        return self.count > cache.EXACT_COUNT_THRESHOLD
+
+
+class CachedPostPaginator(EstimatedCountPaginator):
+    """Кэширует id постов постранично и подгружает посты одним запросом."""
+
+    def __init__(self, object_list, per_page, scope, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+
+    def get_count_key(self):
+        return self.scope
+
+    @cached_property
+    def count(self):
+        return cache.get_post_count(self.scope, self.object_list)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        ids = cache.get_post_ids(
+            self.scope, self.object_list, bottom, bottom + self.per_page)
+        return self._get_page(
+            hydrate_posts(self.object_list, ids), number, self)
+
+
+class TimelinePaginator(Paginator):
+    """Читает из ленты в кэше только id постов нужной страницы."""
+
+    def __init__(self, queryset, per_page, category_id=None, **kwargs):
+        super().__init__(queryset, per_page, **kwargs)
+        self.category_id = category_id
+
+    @cached_property
+    def count(self):
+        return timeline.get_count(self.category_id)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        ids = timeline.get_post_ids(
+            self.category_id, bottom, bottom + self.per_page)
+        return self._get_page(
+            hydrate_posts(self.object_list, ids), number, self)
+
+
+def get_paginated_page(request, queryset, limit=LIMIT_POSTS, cache_scope=None):
+    if cache_scope is None:
+        paginator = EstimatedCountPaginator(queryset, limit)
+    else:
+        paginator = CachedPostPaginator(queryset, limit, cache_scope)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def get_timeline_page(request, queryset, category_id=None, limit=LIMIT_POSTS):
+    paginator = TimelinePaginator(queryset, limit, category_id)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def preload_templates():
+    templates_dir = Path(settings.TEMPLATES_DIR)
+    names = sorted(
+        path.relative_to(templates_dir).as_posix()
+        for path in templates_dir.rglob('*.html')
+    )
+    for name in names:
+        get_template(name)
+    return names
+
+
+def rename_author(user_id, username):
+    with transaction.atomic():
+        for model in (Post, Comment):
+            model.objects.filter(author_id=user_id).update(
+                author_username=username)
+
+
+def _sync_author_username(user_id):
+    for attempt in range(1, RENAME_RETRIES + 1):
+        try:
+            # Имя перечитывается из базы: после нескольких переименований
+            # подряд в записях окажется последнее, в каком бы порядке
+            # ни пришли задания.
+            username = get_user_model().objects.filter(
+                pk=user_id).values_list('username', flat=True).first()
+            if username is not None:
+                rename_author(user_id, username)
+            return
+        except DatabaseError:
+            logger.exception(
+                'author rename for user %s failed, attempt %s of %s',
+                user_id, attempt, RENAME_RETRIES)
+            connection.close()
+            time.sleep(attempt)
+
+
+def _rename_authors():
+    while True:
+        user_id = _renames.get()
+        try:
+            _sync_author_username(user_id)
+        finally:
+            connection.close()
+            _renames.task_done()
+
+
+def _queue_author_rename(user_id):
+    global _rename_thread
+    with _rename_lock:
+        # После fork поток родителя в дочернем процессе не работает.
+        if _rename_thread is None or not _rename_thread.is_alive():
+            _rename_thread = threading.Thread(
+                target=_rename_authors, name='rename-author', daemon=True)
+            _rename_thread.start()
+    _renames.put(user_id)
+
+
+def schedule_author_rename(user_id):
+    """Обновляет имя автора в постах и комментариях после коммита.
+
+    Обновления выполняет один фоновый поток по очереди, чтобы смена
+    имени у автора с тысячами записей не задерживала ответ.
+    """
+    transaction.on_commit(lambda: _queue_author_rename(user_id))
+
 
-def get_paginated_page(request, queryset, limit=LIMIT_POSTS):
-    return Paginator(queryset, limit).get_page(request.GET.get('page'))
+def wait_for_author_renames():
+    _renames.join()
@@ -2,17 +2,21 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
+from django.db.models import Q
 from django.http import Http404, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.views.generic import CreateView, DetailView, UpdateView
 
+from blog import lookups
+from blog.comment_queue import COMMENT_WRITE_BEHIND, comment_queue
 from blog.forms import CommentForm, ProfileForm
 from blog.mixins import AuthorRequiredMixin, PostMixin
-from blog.models import Category, Comment, Post
-from blog.utils import get_paginated_page
+from blog.models import Category, Comment, Post, Profile
+from blog.ratelimit import rate_limit
+from blog.timeline import TIMELINE_FANOUT
+from blog.utils import get_paginated_page, get_timeline_page
 
 
 User = get_user_model()
@@ -20,8 +24,20 @@ User = get_user_model()
 LIMIT_POSTS = getattr(settings, 'LIMIT_POSTS', 10)
 
 
+def get_profile(user):
+    # Профили пользователей, созданных до появления сигнала, создаются
+    # при первом обращении.
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        user.profile, _ = Profile.objects.get_or_create(user=user)
+        return user.profile
+
+
 def profile_view(request, username):
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User.objects.select_related('profile'), username=username)
+    get_profile(user)
     current_time = timezone.now()
 
     posts = user.posts.filter(
@@ -29,15 +45,14 @@ def profile_view(request, username):
             is_published=True) & Q(
             category__is_published=True) & Q(
                 pub_date__lte=current_time)
-    ).annotate(
-        comment_count=Count('comments')
     ).order_by('-pub_date')
 
     return render(
         request,
         'blog/profile.html', {
             'profile': user,
-            'page_obj': get_paginated_page(request, posts, LIMIT_POSTS)
+            'page_obj': get_paginated_page(
+                request, posts, LIMIT_POSTS, cache_scope=f'author:{user.pk}')
         }
     )
 
@@ -102,36 +117,47 @@ class PostDetailView(DetailView):
     context_object_name = 'post'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        # Видимость проверяется в SQL; справочники нужны только для вывода.
+        visible = Q(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now(),
+        )
+        if self.request.user.is_authenticated:
+            visible |= Q(author=self.request.user)
+        return super().get_queryset().filter(visible)
+
     def get_object(self):
         post = super().get_object()
-
-        if (
-            self.request.user != post.author
-            and (
-                not post.is_published
-                or not post.category.is_published
-                or post.pub_date > timezone.now()
-            )
-        ):
-            raise Http404('Страница не найдена')
-
+        lookups.attach([post], 'category')
+        lookups.attach([post], 'location')
         return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = self.object.comments.filter(
+            is_published=True)
+        if COMMENT_WRITE_BEHIND and self.request.user.is_authenticated:
+            # Свои комментарии из очереди автор видит сразу.
+            context['comments'] = [
+                *context['comments'],
+                *comment_queue.pending(self.object.pk, self.request.user.id),
+            ]
         return context
 
 
 def index(request):
-    posts = Post.published.all().annotate(
-        comment_count=Count('comments')
-    ).order_by('-pub_date')
+    posts = Post.published.order_by('-pub_date')
 
-    return render(request, 'blog/index.html', {
-        'page_obj': get_paginated_page(request, posts, LIMIT_POSTS)
-    })
+    if TIMELINE_FANOUT:
+        page_obj = get_timeline_page(request, posts, limit=LIMIT_POSTS)
+    else:
+        page_obj = get_paginated_page(
+            request, posts, LIMIT_POSTS, cache_scope='index')
+
+    return render(request, 'blog/index.html', {'page_obj': page_obj})
 
 
 def category_posts(request, category_slug):
@@ -143,13 +169,22 @@ def category_posts(request, category_slug):
 
     post_list = category.posts(manager='published').all()
 
+    if TIMELINE_FANOUT:
+        page_obj = get_timeline_page(
+            request, post_list, category.pk, LIMIT_POSTS)
+    else:
+        page_obj = get_paginated_page(
+            request, post_list, LIMIT_POSTS,
+            cache_scope=f'category:{category.slug}')
+
     return render(request, 'blog/category.html', {
         'category': category,
-        'page_obj': get_paginated_page(request, post_list, LIMIT_POSTS)
+        'page_obj': page_obj
     })
 
 
 @login_required
+@rate_limit('comment')
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -159,13 +194,16 @@ def add_comment(request, post_id):
             comment = form.save(commit=False)
             comment.author = request.user
             comment.post = post
-            comment.save()
+            if COMMENT_WRITE_BEHIND:
+                comment_queue.enqueue(comment)
+            else:
+                comment.save()
             return redirect('blog:post_detail', post_id)
 
     return render(request, 'blog/detail.html', {
         'form': form,
         'post': post,
-        'comments': post.comments.select_related('author')
+        'comments': post.comments.filter(is_published=True)
     })
 
 
@@ -13,6 +13,23 @@ DEBUG = True
 
 LIMIT_POSTS = 10
 
+POST_CACHE_TIMEOUT = 60
+
+# Выше порога число строк для пагинации берётся из кэша, а не из COUNT(*)
+EXACT_COUNT_THRESHOLD = 1000
+ESTIMATED_COUNT_TIMEOUT = 600
+
+# Готовые ленты постов в кэше, обновляются при сохранении поста
+# и пересобираются не реже чем раз в TIMELINE_TIMEOUT секунд
+TIMELINE_FANOUT = False
+TIMELINE_TIMEOUT = 300
+# В кэше хранятся первые TIMELINE_LENGTH постов ленты кусками
+TIMELINE_LENGTH = 1000
+TIMELINE_CHUNK_SIZE = 100
+
+# Асинхронные варианты страниц только для чтения (для запуска под ASGI)
+ASYNC_VIEWS = False
+
 ALLOWED_HOSTS = []
 
 
@@ -48,14 +65,46 @@ HANDLER500 = 'pages.views.error500'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.CompressionMiddleware',
+    'blog.middleware.HtmlMinifyMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.CachedAuthenticationMiddleware',
+    'blog.middleware.HashingPoolMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Сжатие ответов (gzip, brotli при наличии пакета) и минификация HTML
+RESPONSE_COMPRESSION = False
+HTML_MINIFY = False
+
+# Пользователь из сессии берётся из кэша; нужен общий кэш 'default'
+CACHED_AUTH_USER = False
+
+# Ограничение частоты POST-запросов: (число запросов, период в секундах)
+RATE_LIMITS = {
+    'comment': (10, 60),
+    'registration': (5, 60 * 60),
+}
+
+# Отложенная пакетная запись комментариев через журнал на диске
+COMMENT_WRITE_BEHIND = False
+COMMENT_QUEUE_DIR = BASE_DIR / 'comment_queue'
+COMMENT_QUEUE_BATCH_SIZE = 100
+COMMENT_QUEUE_FLUSH_INTERVAL = 1.0
+
+# Через сколько секунд процесс перечитывает справочники категорий и мест,
+# даже если не получил сигнал об изменении (нужно при LocMemCache)
+LOOKUP_CACHE_TIMEOUT = 60
+
+# Сколько секунд хранить в кэше пользователя из сессии. Кэш 'default'
+# должен быть общим для всех процессов: иначе после смены пароля или
+# блокировки другие процессы до этого срока пускают старые сессии
+USER_CACHE_TIMEOUT = 300
+
 ROOT_URLCONF = 'blogicum.urls'
 
 
@@ -65,7 +114,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [str(TEMPLATES_DIR)],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -73,10 +121,21 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Кэширующий загрузчик включён и при DEBUG: начиная с Django 3.2
+            # автоперезагрузка сбрасывает его при изменении шаблонов.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
+# Разбирать все шаблоны из TEMPLATES_DIR при старте WSGI/ASGI-приложения
+PRELOAD_TEMPLATES = not DEBUG
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
@@ -87,6 +146,54 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+    }
+}
+
+# Хранилище сессий: 'db', 'cached_db' (кэш с записью в БД)
+# или 'signed_cookies' (сессия целиком в подписанной cookie)
+SESSION_PROFILE = 'db'
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+
+
+AUTHENTICATION_BACKENDS = [
+    'blog.backends.BoundedHashingModelBackend',
+]
+
+# Профиль хеширования паролей: 'pbkdf2' или 'argon2' (нужен argon2-cffi).
+# Хеши старых алгоритмов пересчитываются при следующем входе.
+PASSWORD_HASHER_PROFILE = 'pbkdf2'
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'blog.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'blog.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE],
+    *(
+        hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items()
+        if profile != PASSWORD_HASHER_PROFILE
+    ),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PBKDF2_ITERATIONS = 260000
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_COST = 102400
+ARGON2_PARALLELISM = 8
+
+# Хеши паролей считаются в отдельном пуле. Если пул и очередь заняты,
+# запрос сразу получает 503, не дожидаясь места дольше TIMEOUT секунд
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_QUEUE = 16
+PASSWORD_HASHING_TIMEOUT = 0
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -120,5 +227,13 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_root'
+
+# collectstatic сохраняет файлы с хешем в имени, манифест и копии .gz/.br
+STATICFILES_STORAGE = 'blog.staticfiles.CompressedManifestStaticFilesStorage'
+
+# Раздавать STATIC_ROOT средствами Django, без отдельного веб-сервера
+SERVE_STATIC = not DEBUG
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,17 +1,20 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
 from django.views.generic.edit import CreateView
 from blog.forms import CustomUserCreationForm
+from blog.ratelimit import rate_limit
+from blog.staticfiles import serve_static
 
 auth_urlpatterns = [
     path('auth/', include('django.contrib.auth.urls')),
     path(
         'auth/registration/',
-        CreateView.as_view(
+        rate_limit('registration')(CreateView.as_view(
             template_name='registration/registration_form.html',
             form_class=CustomUserCreationForm,
             success_url=reverse_lazy('blog:index'),
-        ),
+        )),
         name='registration',
     ),
 ]
@@ -22,6 +25,14 @@ urlpatterns = [
     path('pages/', include('pages.urls', namespace='pages')),
     *auth_urlpatterns,
 ]
+
+if settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(
+            r'^{}(?P<path>.+)$'.format(settings.STATIC_URL.lstrip('/')),
+            serve_static,
+        ),
+    ]
 # Обработчики ошибок
 handler403 = 'pages.views.error_403'
 handler404 = 'pages.views.error_404'
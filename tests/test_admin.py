@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('url', [
+    '/admin/blog/post/',
+    '/admin/blog/comment/',
+])
+def test_changelist_queries_do_not_grow_with_rows(
+        admin_client, user, published_category, published_location, url):
+    def changelist_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            assert admin_client.get(url).status_code == 200
+        return ctx.captured_queries
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location)
+    mixer.blend('blog.Comment', post=post, author=user)
+    changelist_queries()
+    few = changelist_queries()
+
+    posts = mixer.cycle(10).blend(
+        'blog.Post', author=mixer.SELECT, category=published_category,
+        location=published_location)
+    for post in posts:
+        mixer.blend('blog.Comment', post=post, author=user)
+    many = changelist_queries()
+
+    assert len(many) == len(few)
+    assert not any(
+        'AS "__count"' in query['sql'] for query in many
+    ), 'Список в админке не должен считать все строки таблицы.'
+
+
+def test_bulk_unpublish_is_one_update_and_one_log_entry(
+        admin_client, user, published_category):
+    from django.contrib.admin.models import LogEntry
+
+    from blog.models import Post
+
+    posts = mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True)
+    with CaptureQueriesContext(connection) as ctx:
+        response = admin_client.post('/admin/blog/post/', {
+            'action': 'unpublish_selected',
+            '_selected_action': [post.pk for post in posts],
+        })
+    assert response.status_code == 302
+    updates = [
+        query for query in ctx.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1
+    assert not Post.objects.filter(is_published=True).exists()
+    assert LogEntry.objects.count() == 1
+    ids = sorted(post.pk for post in posts)
+    assert LogEntry.objects.get().change_message == (
+        f'is_published=False; записей: 5; id {ids[0]}–{ids[-1]}: '
+        + ', '.join(map(str, ids)))
+
+
+def test_bulk_unpublish_category_hides_its_posts(
+        admin_client, client, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, location=None)
+    assert client.get(f'/posts/{post.pk}/').status_code == 200
+
+    admin_client.post('/admin/blog/category/', {
+        'action': 'unpublish_selected',
+        '_selected_action': [published_category.pk],
+    })
+    assert client.get(f'/posts/{post.pk}/').status_code == 404
+
+
+def test_purge_action_asks_for_confirmation(
+        admin_client, user, published_category):
+    from blog.models import Post
+
+    posts = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category)
+    data = {
+        'action': 'purge_selected',
+        '_selected_action': [post.pk for post in posts],
+    }
+    response = admin_client.post('/admin/blog/post/', data)
+    assert response.status_code == 200
+    assert 'Будут безвозвратно удалены публикации: 2' in (
+        response.content.decode('utf-8'))
+    assert Post.objects.count() == 2
+
+    response = admin_client.post('/admin/blog/post/', {**data, 'post': 'yes'})
+    assert response.status_code == 302
+    assert not Post.objects.exists()
@@ -0,0 +1,45 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def async_get(rf):
+    def get(view, url, **kwargs):
+        request = rf.get(url)
+        request.user = AnonymousUser()
+        return async_to_sync(view)(request, **kwargs)
+    return get
+
+
+def test_async_read_views(async_get, post_with_published_location):
+    from blog import async_views
+
+    post = post_with_published_location
+    responses = [
+        async_get(async_views.index, '/'),
+        async_get(
+            async_views.category_posts, '/category/',
+            category_slug=post.category.slug),
+        async_get(
+            async_views.profile_view, '/profile/',
+            username=post.author.username),
+        async_get(async_views.post_detail, '/posts/', post_id=post.id),
+    ]
+    for response in responses:
+        assert response.status_code == 200
+        assert post.title in response.content.decode('utf-8')
+
+
+def test_async_post_detail_hides_unpublished(
+        async_get, post_with_published_location):
+    from blog import async_views
+
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    with pytest.raises(Http404):
+        async_get(async_views.post_detail, '/posts/', post_id=post.id)
@@ -0,0 +1,71 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+PASSWORD = 'Sup3r-secret-pass'
+
+
+def test_login_rehashes_outdated_password(mixer):
+    user = mixer.blend(
+        get_user_model(),
+        password=make_password(PASSWORD, hasher='pbkdf2_sha1'))
+    assert Client().login(username=user.username, password=PASSWORD)
+    user.refresh_from_db()
+    assert user.password.startswith('pbkdf2_sha256$'), (
+        'Убедитесь, что при входе хеш пароля пересчитывается '
+        'основным алгоритмом.'
+    )
+    assert not Client().login(username=user.username, password='wrong')
+
+
+@pytest.fixture
+def saturated_pool():
+    from blog import hashers
+
+    taken = 0
+    while hashers._slots.acquire(blocking=False):
+        taken += 1
+    yield
+    for _ in range(taken):
+        hashers._slots.release()
+
+
+@pytest.fixture
+def user_with_password(mixer):
+    return mixer.blend(get_user_model(), password=make_password(PASSWORD))
+
+
+def test_login_returns_503_when_hashing_pool_is_saturated(
+        user_with_password, saturated_pool):
+    user = user_with_password
+    response = Client().post('/auth/login/', {
+        'username': user.username, 'password': PASSWORD})
+    assert response.status_code == 503, (
+        'Убедитесь, что при переполненном пуле хеширования вход сразу '
+        'отвечает 503, а не сообщает о неверном пароле.'
+    )
+
+
+def test_registration_rejected_when_hashing_pool_is_saturated(
+        saturated_pool):
+    response = Client().post('/auth/registration/', {
+        'username': 'new_user',
+        'password1': PASSWORD,
+        'password2': PASSWORD,
+    })
+    assert response.status_code == 503
+    assert not get_user_model().objects.filter(username='new_user').exists()
+
+
+def test_registration_hashes_password(client):
+    response = client.post('/auth/registration/', {
+        'username': 'new_user',
+        'password1': PASSWORD,
+        'password2': PASSWORD,
+    })
+    assert response.status_code == 302
+    user = get_user_model().objects.get(username='new_user')
+    assert user.check_password(PASSWORD)
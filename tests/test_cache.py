@@ -0,0 +1,160 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_post_scans(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    return sum(
+        'LIMIT' in query['sql'] and 'blog_post' in query['sql']
+        for query in ctx.captured_queries
+    )
+
+
+def test_index_post_ids_cached(
+        user_client, many_posts_with_published_locations):
+    assert _count_post_scans(user_client, '/') == 2
+    assert _count_post_scans(user_client, '/') == 0, (
+        'Убедитесь, что при повторном запросе главной страницы список id '
+        'постов берётся из кэша.'
+    )
+
+
+def test_post_save_invalidates_cached_ids(
+        user_client, many_posts_with_published_locations):
+    user_client.get('/')
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    response = user_client.get('/?page=2')
+    assert post not in response.context['page_obj'].object_list
+    assert response.context['page_obj'].paginator.count == (
+        len(many_posts_with_published_locations) - 1
+    ), 'Убедитесь, что сохранение поста сбрасывает кэш ленты.'
+
+
+def _timeline_ids(category_id=None):
+    from blog import timeline
+
+    return timeline.get_post_ids(category_id, 0, 100)
+
+
+def test_timeline_fan_out(
+        monkeypatch, mixer, user, published_category,
+        many_posts_with_published_locations):
+    from blog import timeline
+
+    monkeypatch.setattr(timeline, 'TIMELINE_FANOUT', True)
+    timeline.reset(published_category.pk)
+    expected = [
+        post.pk for post in sorted(
+            many_posts_with_published_locations,
+            key=lambda post: (post.pub_date, post.pk), reverse=True)
+    ]
+    assert _timeline_ids() == expected
+    assert _timeline_ids(published_category.pk) == expected
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category)
+    assert _timeline_ids()[0] == post.pk, (
+        'Убедитесь, что новый пост сразу попадает в начало ленты.'
+    )
+    post.is_published = False
+    post.save()
+    assert post.pk not in _timeline_ids(published_category.pk)
+
+
+def test_timeline_picks_up_post_when_pub_date_is_due(
+        monkeypatch, mixer, user, published_category):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from blog import timeline
+
+    monkeypatch.setattr(timeline, 'TIMELINE_FANOUT', True)
+    timeline.reset(published_category.pk)
+    now = timezone.now()
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=now + timedelta(hours=1))
+    assert post.pk not in _timeline_ids()
+
+    # Прошло больше TIMELINE_TIMEOUT, пост стал доступен, но ни один
+    # процесс с этим кэшем не запускал fanout_due_posts.
+    monkeypatch.setattr(timezone, 'now', lambda: now + timedelta(hours=2))
+    assert post.pk not in _timeline_ids(), (
+        'До истечения TIMELINE_TIMEOUT лента берётся из кэша.'
+    )
+    monkeypatch.setattr(timeline, 'TIMELINE_TIMEOUT', -1)
+    assert _timeline_ids()[0] == post.pk
+
+
+def test_timeline_is_stored_in_capped_chunks(
+        monkeypatch, mixer, user, published_category):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from blog import timeline
+    from blog.models import Post
+
+    monkeypatch.setattr(timeline, 'TIMELINE_FANOUT', True)
+    monkeypatch.setattr(timeline, 'TIMELINE_LENGTH', 5)
+    monkeypatch.setattr(timeline, 'TIMELINE_CHUNK_SIZE', 2)
+    now = timezone.now()
+
+    def blend(days):
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, pub_date=now - timedelta(days=days))
+
+    posts = [blend(days) for days in range(10, 18)]
+    timeline.reset(published_category.pk)
+
+    def check():
+        expected = list(Post.published.order_by(
+            '-pub_date', '-pk').values_list('pk', flat=True))
+        assert timeline.get_count() == len(expected)
+        assert [
+            pk for start in range(0, 15, 3)
+            for pk in timeline.get_post_ids(None, start, start + 3)
+        ] == expected
+
+    check()
+    rebuild = timeline.rebuild
+    rebuilds = []
+    monkeypatch.setattr(
+        timeline, 'rebuild',
+        lambda *args: rebuilds.append(args) or rebuild(*args))
+    # Новые посты попадают в первый кусок, он делится, хвост обрезается.
+    fresh = [blend(days) for days in range(5)]
+    check()
+    fresh[3].pub_date = now
+    fresh[3].save()
+    check()
+    fresh[1].is_published = False
+    fresh[1].save()
+    check()
+    fresh[0].delete()
+    check()
+    assert rebuilds == [], (
+        'Убедитесь, что изменения в сохранённой части ленты не пересобирают '
+        'её целиком.'
+    )
+    # Посты за обрезанным хвостом ленты.
+    posts[3].pub_date = now
+    posts[3].save()
+    check()
+    posts[-1].delete()
+    check()
+
+
+def test_fanout_due_posts_requires_shared_cache():
+    from django.core.management import CommandError, call_command
+
+    with pytest.raises(CommandError):
+        call_command('fanout_due_posts')
@@ -0,0 +1,36 @@
+import pytest
+from django.core.cache import cache
+from mixer.backend.django import mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_hidden_comments_are_not_listed_or_counted(
+        client, user, published_category):
+    cache.clear()
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=None)
+    mixer.blend(
+        'blog.Comment', post=post, author=user, text='Видимый',
+        is_published=True)
+    mixer.blend(
+        'blog.Comment', post=post, author=user, text='Скрытый',
+        is_published=False)
+
+    detail = client.get(f'/posts/{post.id}/').content.decode('utf-8')
+    assert 'Видимый' in detail
+    assert 'Скрытый' not in detail
+    assert 'Комментарии (1)' in client.get('/').content.decode('utf-8')
+
+
+def test_bulk_hide_comments(admin_client, user, published_category):
+    from blog.models import Comment
+
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    comments = mixer.cycle(3).blend('blog.Comment', post=post, author=user)
+    admin_client.post('/admin/blog/comment/', {
+        'action': 'unpublish_selected',
+        '_selected_action': [comment.pk for comment in comments],
+    })
+    assert not Comment.objects.filter(is_published=True).exists()
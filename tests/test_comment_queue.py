@@ -0,0 +1,119 @@
+import json
+import os
+import uuid
+
+import pytest
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def write_behind(monkeypatch, tmp_path):
+    from blog import comment_queue, views
+
+    queue = comment_queue.CommentQueue(
+        tmp_path, batch_size=10, flush_interval=0.05)
+    monkeypatch.setattr(views, 'COMMENT_WRITE_BEHIND', True)
+    monkeypatch.setattr(views, 'comment_queue', queue)
+    return queue
+
+
+def test_queued_comment_is_visible_to_author_and_written(
+        write_behind, user_client, another_user_client,
+        post_with_published_location):
+    from blog.models import Comment
+
+    post_id = post_with_published_location.id
+    response = user_client.post(
+        f'/posts/{post_id}/comment', {'text': 'Отложенный комментарий'})
+    assert response.status_code == 302
+    assert 'Отложенный комментарий' in user_client.get(
+        f'/posts/{post_id}/').content.decode('utf-8')
+
+    write_behind.flush()
+    assert Comment.objects.filter(text='Отложенный комментарий').exists()
+    assert write_behind.pending(post_id) == []
+    assert [
+        path.read_text()
+        for path in write_behind.directory.glob('comments-*.jsonl')
+    ] == ['']
+    assert 'Отложенный комментарий' in another_user_client.get(
+        f'/posts/{post_id}/').content.decode('utf-8')
+
+
+@pytest.mark.parametrize('pid', [999999999, os.getpid()])
+def test_orphaned_journal_is_replayed(
+        tmp_path, user, post_with_published_location, pid):
+    from blog.comment_queue import CommentQueue
+    from blog.models import Comment
+
+    # Журнал с собственным PID остаётся, когда контейнер перезапускается
+    # и процесс снова получает тот же номер.
+    orphan = tmp_path / f'comments-{pid}.jsonl'
+    orphan.write_text(json.dumps({
+        'text': 'Из журнала',
+        'post_id': post_with_published_location.id,
+        'author_id': user.id,
+        'created_at': '2024-01-01T00:00:00+00:00',
+        'idempotency_key': uuid.uuid4().hex,
+    }) + '\n')
+
+    queue = CommentQueue(tmp_path, flush_interval=0.05)
+    queue.start()
+    queue.flush()
+    assert not orphan.exists()
+    assert Comment.objects.filter(text='Из журнала').count() == 1
+
+
+def test_replayed_journal_does_not_duplicate_written_comments(
+        tmp_path, user, post_with_published_location):
+    from blog.comment_queue import CommentQueue
+    from blog.models import Comment
+
+    # Процесс упал после записи пачки, но до того, как переписал журнал.
+    written = Comment.objects.create(
+        text='Уже записан', author=user, post=post_with_published_location,
+        idempotency_key=uuid.uuid4())
+    orphan = tmp_path / 'comments-999999999-dead.jsonl'
+    orphan.write_text(''.join(
+        json.dumps({
+            'text': text,
+            'post_id': post_with_published_location.id,
+            'author_id': user.id,
+            'author_username': user.username,
+            'created_at': '2024-01-01T00:00:00+00:00',
+            'idempotency_key': key.hex,
+        }) + '\n'
+        for text, key in [
+            ('Уже записан', written.idempotency_key),
+            ('Ещё не записан', uuid.uuid4()),
+        ]
+    ))
+
+    queue = CommentQueue(tmp_path, flush_interval=0.05)
+    queue.start()
+    queue.flush()
+    assert Comment.objects.filter(text='Уже записан').count() == 1
+    assert Comment.objects.filter(text='Ещё не записан').count() == 1
+    assert [
+        path.read_text() for path in tmp_path.glob('comments-*.jsonl')
+    ] == ['']
+
+
+def test_failing_batch_does_not_block_writer(
+        monkeypatch, tmp_path, user, post_with_published_location):
+    from django.db import OperationalError
+
+    from blog.comment_queue import CommentQueue
+    from blog.models import Comment
+
+    def fail(*args, **kwargs):
+        raise OperationalError('database is locked')
+
+    monkeypatch.setattr(Comment.objects, 'bulk_create', fail)
+    queue = CommentQueue(tmp_path, flush_interval=0.01, max_retries=2)
+    queue.enqueue(Comment(
+        text='Сохранится по одному', author=user,
+        post=post_with_published_location))
+    queue.flush()
+    assert Comment.objects.filter(text='Сохранится по одному').exists()
@@ -0,0 +1,59 @@
+import gzip
+
+import pytest
+from django.test import Client, override_settings
+
+from blog.middleware import accepts_encoding, minify_html
+
+
+def test_minify_html_keeps_preformatted_blocks():
+    html = (
+        '<div>\n    <p>Текст</p>\n  </div>\n'
+        '<textarea name="text">строка 1\n\n  строка 2</textarea>'
+    )
+    assert minify_html(html) == (
+        '<div>\n<p>Текст</p>\n</div>\n'
+        '<textarea name="text">строка 1\n\n  строка 2</textarea>'
+    )
+
+
+@pytest.mark.parametrize('header, accepted', [
+    ('gzip, deflate, br', True),
+    ('deflate, gzip;q=0.5', True),
+    ('gzip;q=0', False),
+    ('GZIP ; q=0.0, *', False),
+    ('*;q=0.1', True),
+    ('br, *;q=0', False),
+    ('', False),
+])
+def test_accepts_encoding_honours_quality(rf, header, accepted):
+    request = rf.get('/', HTTP_ACCEPT_ENCODING=header)
+    assert accepts_encoding(request, 'gzip') is accepted
+
+
+@pytest.mark.django_db
+@override_settings(HTML_MINIFY=True, RESPONSE_COMPRESSION=True)
+def test_index_is_minified_and_compressed(post_with_published_location):
+    client = Client()
+    plain = client.get('/')
+    compressed = client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+    assert compressed['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed['Vary']
+    content = gzip.decompress(compressed.content)
+    assert content == plain.content
+    assert post_with_published_location.title in content.decode('utf-8')
+    assert b'\n    <' not in content
+
+
+def test_cached_auth_warns_about_process_local_cache(settings):
+    from blog.checks import check_shared_user_cache
+
+    settings.DEBUG = False
+    assert check_shared_user_cache(None) == []
+    settings.CACHED_AUTH_USER = True
+    assert [
+        warning.id for warning in check_shared_user_cache(None)
+    ] == ['blog.W001']
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    assert check_shared_user_cache(None) == []
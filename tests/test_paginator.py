@@ -0,0 +1,70 @@
+import pytest
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+
+def _render_paginator(paginator, number):
+    return render_to_string(
+        'includes/paginator.html', {'page_obj': paginator.page(number)})
+
+
+def test_paginator_renders_window_of_pages():
+    paginator = Paginator(range(100000), 10)
+    for number in (1, 5000, 10000):
+        content = _render_paginator(paginator, number)
+        assert content.count('class="page-item') <= 15, (
+            'Убедитесь, что пагинатор выводит ограниченное число ссылок '
+            'на страницы, а не все страницы подряд.'
+        )
+        assert f'<span class="page-link">{number}</span>' in content
+    assert '?page=10000' in _render_paginator(paginator, 5000)
+
+
+def test_paginator_estimated_mode_hides_last_page():
+    paginator = Paginator(range(100000), 10)
+    paginator.is_estimated = True
+    content = _render_paginator(paginator, 5000)
+    assert '?page=10000' not in content
+    assert '?page=5001' in content
+
+
+@pytest.mark.django_db
+def test_estimated_count_above_threshold(
+        monkeypatch, mixer, user, many_posts_with_published_locations):
+    from blog import cache
+    from blog.models import Post
+    from blog.utils import EstimatedCountPaginator
+
+    monkeypatch.setattr(cache, 'EXACT_COUNT_THRESHOLD', 5)
+    total = len(many_posts_with_published_locations)
+    posts = Post.objects.filter(author=user).order_by('-pub_date')
+    paginator = EstimatedCountPaginator(posts, 10)
+    assert paginator.count == total
+    assert paginator.is_estimated
+
+    mixer.blend('blog.Post', author=user)
+    assert EstimatedCountPaginator(posts, 10).count == total, (
+        'Убедитесь, что число строк выше порога берётся из кэша.'
+    )
+    monkeypatch.setattr(cache, 'EXACT_COUNT_THRESHOLD', 100)
+    paginator = EstimatedCountPaginator(posts, 10)
+    assert paginator.count == total + 1
+    assert not paginator.is_estimated
+
+
+@pytest.mark.django_db
+def test_profile_marks_estimated_post_count(
+        monkeypatch, user, unlogged_client,
+        many_posts_with_published_locations):
+    from blog import cache
+
+    url = f'/profile/{user.username}/'
+    assert 'Публикаций: около' not in unlogged_client.get(url).content.decode()
+    monkeypatch.setattr(cache, 'EXACT_COUNT_THRESHOLD', 5)
+    cache.invalidate_posts()
+    content = unlogged_client.get(url).content.decode()
+    assert (
+        f'Публикаций: около {len(many_posts_with_published_locations)}'
+        in content
+    ), 'Убедитесь, что приблизительное число публикаций так и подписано.'
+    assert content.count('<small>') == content.count('</small>')
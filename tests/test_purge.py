@@ -0,0 +1,42 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_purge_posts_command_deletes_in_chunks(
+        user, another_user, published_category):
+    from blog.models import Comment, Post
+
+    posts = mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category)
+    other_post = mixer.blend(
+        'blog.Post', author=another_user, category=published_category)
+    for post in posts:
+        mixer.blend('blog.Comment', post=post, author=another_user)
+    mixer.blend('blog.Comment', post=other_post, author=user)
+
+    out = StringIO()
+    call_command(
+        'purge_posts', author=user.username, chunk_size=2, stdout=out)
+
+    assert 'Посты: удалено 4' in out.getvalue()
+    assert 'Всего удалено постов: 5' in out.getvalue()
+    assert list(Post.objects.all()) == [other_post]
+    assert not Comment.objects.filter(author=user).exists()
+    assert not Comment.objects.filter(post__in=posts).exists()
+
+
+def test_purge_posts_runs_fixed_queries_per_chunk(
+        user, published_category, django_assert_num_queries):
+    from blog.models import Post
+    from blog.purge import purge_posts
+
+    mixer.cycle(4).blend(
+        'blog.Post', author=user, category=published_category)
+    # На порцию: выборка id, savepoint, два DELETE, release; и пустая выборка.
+    with django_assert_num_queries(2 * 5 + 1):
+        assert purge_posts(Post.objects.all(), chunk_size=2) == 4
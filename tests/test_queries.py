@@ -0,0 +1,221 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _post_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    return response, [
+        query['sql'] for query in ctx.captured_queries
+        if 'FROM "blog_post"' in query['sql']
+    ]
+
+
+def test_edit_post_loads_post_once(user_client, post_with_published_location):
+    response, queries = _post_queries(
+        user_client, f'/posts/{post_with_published_location.id}/edit/')
+    assert response.status_code == 200
+    assert len(queries) == 1, (
+        'Убедитесь, что на странице редактирования пост загружается '
+        'из базы данных один раз.'
+    )
+
+
+def test_edit_post_by_another_user_loads_post_once(
+        another_user_client, post_with_published_location):
+    response, queries = _post_queries(
+        another_user_client,
+        f'/posts/{post_with_published_location.id}/edit/')
+    assert response.status_code == 302
+    assert len(queries) == 1
+
+
+def test_edit_post_query_count(
+        user_client, post_with_published_location,
+        django_assert_max_num_queries):
+    # Сессия, пользователь, пост и варианты для категории и места.
+    with django_assert_max_num_queries(5):
+        user_client.get(f'/posts/{post_with_published_location.id}/edit/')
+
+
+@pytest.mark.parametrize('client_fixture', ['user_client', 'unlogged_client'])
+def test_post_detail_query_count(
+        request, client_fixture, mixer, comment_to_a_post,
+        django_assert_max_num_queries):
+    client = request.getfixturevalue(client_fixture)
+    post = comment_to_a_post.post
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    # Первый запрос загружает справочники категорий и местоположений.
+    client.get(f'/posts/{post.id}/')
+    # Сессия, пользователь, пост и комментарии.
+    with django_assert_max_num_queries(4):
+        response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+
+
+@override_settings(CACHED_AUTH_USER=True)
+def test_authenticated_user_cached_between_requests(user, user_client):
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get('/')
+    assert not [
+        query for query in ctx.captured_queries
+        if 'FROM "auth_user"' in query['sql']
+    ], 'Убедитесь, что пользователь из сессии берётся из кэша.'
+
+    user.username = 'renamed_user'
+    user.save()
+    assert 'renamed_user' in user_client.get('/').content.decode('utf-8')
+
+
+def test_post_list_does_not_join_users(
+        unlogged_client, many_posts_with_published_locations):
+    response, queries = _post_queries(unlogged_client, '/')
+    assert response.status_code == 200
+    assert not [query for query in queries if 'auth_user' in query], (
+        'Убедитесь, что имя автора в списке постов берётся из самого поста.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_username_change_updates_posts_and_comments(
+        user, user_client, post_with_published_location, mixer):
+    from blog.models import Comment, Post
+    from blog.utils import wait_for_author_renames
+
+    mixer.blend('blog.Comment', post=post_with_published_location, author=user)
+
+    user_client.post(f'/profile/{user.username}/edit_profile/', {
+        'first_name': 'Имя',
+        'last_name': 'Фамилия',
+        'username': 'new_name',
+        'email': 'new@example.com',
+    })
+    wait_for_author_renames()
+    assert set(Post.objects.filter(author=user).values_list(
+        'author_username', flat=True)) == {'new_name'}
+    assert set(Comment.objects.filter(author=user).values_list(
+        'author_username', flat=True)) == {'new_name'}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_username_change_outside_profile_form(
+        user, post_with_published_location):
+    from blog.models import Post
+    from blog.utils import wait_for_author_renames
+
+    user.username = 'renamed_in_admin'
+    user.save()
+    wait_for_author_renames()
+    assert Post.objects.get(
+        pk=post_with_published_location.pk
+    ).author_username == 'renamed_in_admin'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_consecutive_username_changes_keep_the_last_one(
+        user, post_with_published_location):
+    from blog.models import Post
+    from blog.utils import wait_for_author_renames
+
+    for username in ('first_rename', 'second_rename'):
+        user.username = username
+        user.save()
+    wait_for_author_renames()
+    assert Post.objects.get(
+        pk=post_with_published_location.pk
+    ).author_username == 'second_rename'
+
+
+def test_loaddata_fills_author_username(tmp_path, user, published_category):
+    import json
+
+    from django.core.management import call_command
+
+    from blog.models import Post
+
+    fixture = tmp_path / 'posts.json'
+    fixture.write_text(json.dumps([{
+        'model': 'blog.post',
+        'pk': 1000,
+        'fields': {
+            'title': 'Из фикстуры', 'text': 'Текст',
+            'pub_date': '2024-01-01T00:00:00Z',
+            'created_at': '2024-01-01T00:00:00Z',
+            'author': user.pk, 'category': published_category.pk,
+        },
+    }]))
+    call_command('loaddata', str(fixture), verbosity=0)
+    assert Post.objects.get(pk=1000).author_username == user.username
+
+
+def test_profile_created_with_user(django_user_model):
+    user = django_user_model.objects.create(username='new_author')
+    assert user.profile.pk is not None
+
+
+def test_profile_page_query_count(
+        user, unlogged_client, many_posts_with_published_locations,
+        django_assert_max_num_queries):
+    from django.core.cache import cache
+
+    from blog.cache import invalidate_posts
+
+    url = f'/profile/{user.username}/'
+    cache.clear()
+    unlogged_client.get(url)
+    # Пользователь с профилем, подсчёт и id постов, сами посты.
+    invalidate_posts()
+    with django_assert_max_num_queries(4):
+        response = unlogged_client.get(url)
+    assert response.status_code == 200
+
+    user.profile.bio = 'Новое описание'
+    user.profile.save()
+    assert 'Новое описание' in unlogged_client.get(url).content.decode()
+
+
+def test_post_list_takes_categories_and_locations_from_lookups(
+        unlogged_client, many_posts_with_published_locations):
+    unlogged_client.get('/')
+    response, queries = _post_queries(unlogged_client, '/')
+    assert response.status_code == 200
+    assert not [
+        query for query in queries
+        if '"blog_category"."title"' in query
+        or '"blog_location"."name"' in query
+    ], 'Категории и местоположения должны браться из кэша справочников.'
+
+
+def test_lookup_table_reloads_on_miss(published_category):
+    from blog import lookups
+    from blog.models import Category, Post
+
+    lookups.get_table(Category).clear()
+    post = Post(category_id=published_category.pk)
+    lookups.attach([post], 'category')
+    assert post.category == published_category
+
+
+def test_lookup_table_expires_without_signal(monkeypatch, published_category):
+    from blog import lookups
+    from blog.models import Category
+
+    def cached_is_published():
+        return lookups.get_table(Category)[
+            published_category.pk].is_published
+
+    lookups.get_table(Category, reload=True)
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False)
+    assert cached_is_published(), 'До истечения таймаута таблица не меняется.'
+
+    monkeypatch.setattr(lookups, 'LOOKUP_CACHE_TIMEOUT', -1)
+    lookups.get_table(Category, reload=True)
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=True)
+    assert cached_is_published()
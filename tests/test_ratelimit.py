@@ -0,0 +1,60 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_rate_limit(
+        monkeypatch, user_client, post_with_published_location):
+    from blog import ratelimit
+    from blog.models import Comment
+
+    cache.clear()
+    monkeypatch.setitem(ratelimit.RATE_LIMITS, 'comment', (2, 60))
+    url = f'/posts/{post_with_published_location.id}/comment'
+    statuses = [
+        user_client.post(url, {'text': f'Комментарий {i}'}).status_code
+        for i in range(3)
+    ]
+    assert statuses == [302, 302, 429], (
+        'Убедитесь, что частота добавления комментариев ограничена.'
+    )
+    assert Comment.objects.count() == 2
+    assert ratelimit.get_rejected_count('comment') == 1
+    assert user_client.get(
+        f'/posts/{post_with_published_location.id}/').status_code == 200
+
+
+def test_registration_rate_limit_rejects_before_validation(
+        monkeypatch, client, django_assert_num_queries):
+    from blog import ratelimit
+
+    cache.clear()
+    monkeypatch.setitem(ratelimit.RATE_LIMITS, 'registration', (1, 3600))
+    assert client.post('/auth/registration/', {}).status_code == 200
+    with django_assert_num_queries(0):
+        response = client.post('/auth/registration/', {})
+    assert response.status_code == 429
+
+
+def test_concurrent_burst_does_not_exceed_limit(monkeypatch, rf):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from django.contrib.auth.models import AnonymousUser
+
+    from blog import ratelimit
+
+    cache.clear()
+    monkeypatch.setitem(ratelimit.RATE_LIMITS, 'comment', (5, 60))
+    request = rf.post('/')
+    request.user = AnonymousUser()
+    barrier = threading.Barrier(20)
+
+    def burst(_):
+        barrier.wait()
+        return ratelimit.take_token('comment', request)
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        allowed = sum(pool.map(burst, range(20)))
+    assert allowed == 5
@@ -0,0 +1,19 @@
+import pytest
+from django.urls import reverse
+
+from blog.routes import ROUTES, blog_url
+
+
+@pytest.mark.parametrize('name', ROUTES)
+def test_blog_url_matches_reverse(name):
+    values = {
+        'post_id': 42,
+        'comment_id': 7,
+        'username': 'автор.name@example+test',
+        'category_slug': 'travel-2023',
+    }
+    args = [values[kwarg] for kwarg in ROUTES[name]]
+    assert blog_url(name, *args) == reverse(f'blog:{name}', args=args), (
+        f'Убедитесь, что blog_url строит такой же адрес, как reverse, '
+        f'для маршрута `{name}`.'
+    )
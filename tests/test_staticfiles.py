@@ -0,0 +1,94 @@
+import gzip
+import json
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import override_settings
+
+from blog.staticfiles import serve_static
+
+
+@pytest.fixture
+def collected_static(tmp_path):
+    with override_settings(STATIC_ROOT=tmp_path):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        yield tmp_path
+
+
+def test_collectstatic_writes_hashed_and_compressed_files(collected_static):
+    manifest = json.loads(
+        (collected_static / 'staticfiles.json').read_text())
+    hashed_css = manifest['paths']['css/bootstrap.min.css']
+    assert hashed_css != 'css/bootstrap.min.css'
+    assert (collected_static / (hashed_css + '.gz')).exists()
+    assert static('css/bootstrap.min.css').endswith(hashed_css), (
+        'Убедитесь, что тег static подставляет имя файла с хешем.'
+    )
+
+
+def test_serve_static_hashed_file(rf, collected_static):
+    hashed_css = staticfiles_storage.stored_name('css/bootstrap.min.css')
+    request = rf.get('/static/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+    response = serve_static(request, hashed_css)
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'text/css'
+    assert 'immutable' in response['Cache-Control']
+    content = gzip.decompress(b''.join(response.streaming_content))
+    assert content == (collected_static / hashed_css).read_bytes()
+
+
+def test_serve_static_respects_refused_gzip(rf, collected_static):
+    hashed_css = staticfiles_storage.stored_name('css/bootstrap.min.css')
+    request = rf.get('/static/', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+    response = serve_static(request, hashed_css)
+    assert not response.has_header('Content-Encoding')
+    assert b''.join(response.streaming_content) == (
+        collected_static / hashed_css).read_bytes()
+
+
+def test_trim_css_keeps_only_used_classes():
+    from blog.management.commands.build_critical_css import trim_css
+
+    css = (
+        ':root{--x:1}body{margin:0}.card,.modal{display:block}'
+        '.btn:not(.disabled,.active){color:red}.toast{opacity:0}'
+        '@media (min-width:576px){.card{width:1px}.toast{width:2px}}'
+        '@media print{.modal{display:none}}'
+    )
+    assert trim_css(css, {'card', 'btn', 'disabled', 'active'}) == (
+        ':root{--x:1}body{margin:0}.card{display:block}'
+        '.btn:not(.disabled,.active){color:red}'
+        '@media (min-width:576px){.card{width:1px}}'
+    )
+
+
+def test_critical_css_inlines_first_screen_and_links_the_rest(
+        monkeypatch, tmp_path, settings):
+    import shutil
+    from io import StringIO
+
+    from blog.templatetags import blog_tags
+
+    static_dir = tmp_path / 'static'
+    (static_dir / 'css').mkdir(parents=True)
+    source_dir = settings.STATICFILES_DIRS[0]
+    shutil.copy(
+        source_dir / 'css/bootstrap.min.css', static_dir / 'css')
+    monkeypatch.setattr(blog_tags, '_static_css', {})
+    with override_settings(
+            STATICFILES_DIRS=[static_dir], STATIC_ROOT=tmp_path / 'root'):
+        call_command('build_critical_css', stdout=StringIO())
+        call_command('collectstatic', interactive=False, verbosity=0)
+        html = blog_tags.critical_css()
+        trimmed = static('css/bootstrap.trimmed.css')
+
+    critical = (static_dir / 'css/bootstrap.critical.css').read_text()
+    assert f'<style>{critical}</style>' in html
+    assert len(critical) < len(
+        (static_dir / 'css/bootstrap.trimmed.css').read_text())
+    assert f'href="{trimmed}"' in html
+    assert trimmed != '/static/css/bootstrap.trimmed.css', (
+        'Убедитесь, что урезанный Bootstrap подключается файлом с хешем.'
+    )